@@ -0,0 +1,28 @@
+"""Add plant date and location indexes
+
+Revision ID: 4c81e0d3f5a7
+Revises: b256deef2c1e
+Create Date: 2026-10-18 17:31:09.532817
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4c81e0d3f5a7'
+down_revision = 'b256deef2c1e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # See 7a62461791b4 about concurrent index creation
+    with op.get_context().autocommit_block():
+        op.create_index('ix_plant_owner_id_date_id', 'plant', ['owner_id', 'date', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_plant_owner_id_location_id', 'plant', ['owner_id', 'location', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_plant_owner_id_location_id', table_name='plant', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_plant_owner_id_date_id', table_name='plant', postgresql_concurrently=True, if_exists=True)
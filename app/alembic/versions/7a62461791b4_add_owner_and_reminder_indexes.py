@@ -0,0 +1,34 @@
+"""Add owner and reminder indexes
+
+Revision ID: 7a62461791b4
+Revises: cf089a731f73
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7a62461791b4'
+down_revision = 'cf089a731f73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY does not lock writes but cannot run inside a
+    # transaction. If it fails it leaves an invalid index behind, drop it and
+    # run the migration again.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_plant_owner_id_id', 'plant', ['owner_id', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_item_owner_id_id', 'item', ['owner_id', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(op.f('ix_reminder_plant_id'), 'reminder', ['plant_id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(op.f('ix_reminder_remind_time'), 'reminder', ['remind_time'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_reminder_remind_time'), table_name='reminder', postgresql_concurrently=True, if_exists=True)
+        op.drop_index(op.f('ix_reminder_plant_id'), table_name='reminder', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_item_owner_id_id', table_name='item', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_plant_owner_id_id', table_name='plant', postgresql_concurrently=True, if_exists=True)
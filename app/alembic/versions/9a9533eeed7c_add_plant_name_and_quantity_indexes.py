@@ -0,0 +1,28 @@
+"""Add plant name and quantity indexes
+
+Revision ID: 9a9533eeed7c
+Revises: 4c81e0d3f5a7
+Create Date: 2026-10-18 19:02:41.218764
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9a9533eeed7c'
+down_revision = '4c81e0d3f5a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # See 7a62461791b4 about concurrent index creation
+    with op.get_context().autocommit_block():
+        op.create_index('ix_plant_owner_id_name_id', 'plant', ['owner_id', 'name', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_plant_owner_id_quantity_id', 'plant', ['owner_id', 'quantity', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_plant_owner_id_quantity_id', table_name='plant', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_plant_owner_id_name_id', table_name='plant', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,31 @@
+"""Add plant trigram indexes
+
+Revision ID: b256deef2c1e
+Revises: 659883edb21c
+Create Date: 2026-10-18 17:02:13.540871
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b256deef2c1e'
+down_revision = '659883edb21c'
+branch_labels = None
+depends_on = None
+
+SEARCH_FIELDS = ('name', 'cultivar', 'location', 'notes')
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Built concurrently like the owner indexes, see 7a62461791b4
+    with op.get_context().autocommit_block():
+        for name in SEARCH_FIELDS:
+            op.create_index(f'ix_plant_{name}_trgm', 'plant', [name], unique=False, postgresql_using='gin', postgresql_ops={name: 'gin_trgm_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name in reversed(SEARCH_FIELDS):
+            op.drop_index(f'ix_plant_{name}_trgm', table_name='plant', postgresql_concurrently=True, if_exists=True)
@@ -1,17 +1,36 @@
-from collections.abc import Generator
-from typing import Annotated
+import codecs
+import csv
+import json
+import uuid
+from collections.abc import (
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Generator,
+    Iterator,
+)
+from typing import Annotated, Any, BinaryIO, TypeVar
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
-from sqlmodel import Session
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app import crud, crud_async
 from app.core import security
 from app.core.config import settings
-from app.core.db import engine
-from app.models import TokenPayload, User
+from app.core.db import (
+    async_engine,
+    async_replica_engine,
+    engine,
+    replica_engine,
+    wrote_recently,
+)
+from app.core.invalidation import bus
+from app.models import PlantCreate, PlantFilters, PlantPublic, TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
@@ -19,15 +38,23 @@ reusable_oauth2 = OAuth2PasswordBearer(
 
 
 def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+    # Rows written by the request stay loaded after the commit, so creates
+    # return them without reading them back
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
         yield session
 
 
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def get_token_payload(token: TokenDep) -> TokenPayload:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
@@ -38,7 +65,46 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
+    return token_data
+
+
+TokenPayloadDep = Annotated[TokenPayload, Depends(get_token_payload)]
+
+
+def get_read_db(token_data: TokenPayloadDep) -> Generator[Session, None, None]:
+    """
+    Session for read-only endpoints: bound to the replica, unless the caller
+    or someone else wrote the caller's rows recently and the caller must read
+    the writes from the primary.
+    """
+    bind = engine if wrote_recently(token_data.sub) else replica_engine
+    with Session(bind) as session:
+        yield session
+
+
+async def get_async_read_db(
+    token_data: TokenPayloadDep,
+) -> AsyncGenerator[AsyncSession, None]:
+    bind = async_engine if wrote_recently(token_data.sub) else async_replica_engine
+    async with AsyncSession(bind, expire_on_commit=False) as session:
+        yield session
+
+
+ReadSessionDep = Annotated[Session, Depends(get_read_db)]
+AsyncReadSessionDep = Annotated[AsyncSession, Depends(get_async_read_db)]
+
+
+def _token_user_id(token_data: TokenPayload) -> uuid.UUID:
+    try:
+        return uuid.UUID(token_data.sub or "")
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+
+
+def _active_user(user: User | None) -> User:
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
@@ -46,7 +112,93 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
     return user
 
 
+def get_current_user(session: SessionDep, token_data: TokenPayloadDep) -> User:
+    """
+    Current user for endpoints that write, always read from the database:
+    a cached copy could still be active or a superuser after a change made
+    by another worker whose invalidation was missed.
+    """
+    user = _active_user(
+        crud.load_user(session=session, user_id=_token_user_id(token_data))
+    )
+    session.info["user_id"] = user.id
+    return user
+
+
+def _principal_from_claims(token_data: TokenPayload) -> User | None:
+    # Changes made while the invalidation listener was disconnected are read
+    # back from the userchange table when it connects, without it the claims
+    # could outlive a deactivation
+    if not (
+        settings.AUTH_STATELESS_READS
+        and bus.connected
+        and token_data.sub
+        and token_data.email
+        and token_data.is_superuser is not None
+        and token_data.is_active is not None
+        and security.token_claims_are_fresh(token_data.sub, token_data.iat)
+    ):
+        return None
+    if not token_data.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return User(
+        id=_token_user_id(token_data),
+        email=token_data.email,
+        full_name=token_data.full_name,
+        is_superuser=token_data.is_superuser,
+        is_active=token_data.is_active,
+        hashed_password="",
+    )
+
+
+def get_current_principal(token_data: TokenPayloadDep) -> User:
+    """
+    Current user for read-only endpoints.
+
+    The user may come from the user cache, otherwise it is loaded from the
+    primary so a lagging replica's row is never cached. The lookup uses a
+    session of its own, closed before the endpoint checks out a connection
+    for its reads, so a request never holds two. With
+    AUTH_STATELESS_READS enabled it is built from the verified token claims
+    instead, skipping the lookup unless the user changed after the token was
+    issued or the invalidation listener is not connected. The returned object
+    must not be written.
+    """
+    principal = _principal_from_claims(token_data)
+    if principal is not None:
+        return principal
+    with Session(engine) as session:
+        return _active_user(
+            crud.get_user(session=session, user_id=_token_user_id(token_data))
+        )
+
+
+async def get_current_user_async(
+    session: AsyncSessionDep, token_data: TokenPayloadDep
+) -> User:
+    user = _active_user(
+        await crud_async.load_user(session=session, user_id=_token_user_id(token_data))
+    )
+    session.info["user_id"] = user.id
+    return user
+
+
+async def get_current_principal_async(token_data: TokenPayloadDep) -> User:
+    principal = _principal_from_claims(token_data)
+    if principal is not None:
+        return principal
+    async with AsyncSession(async_engine) as session:
+        return _active_user(
+            await crud_async.get_user(
+                session=session, user_id=_token_user_id(token_data)
+            )
+        )
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentPrincipal = Annotated[User, Depends(get_current_principal)]
+AsyncCurrentUser = Annotated[User, Depends(get_current_user_async)]
+AsyncCurrentPrincipal = Annotated[User, Depends(get_current_principal_async)]
 
 
 def get_current_active_superuser(current_user: CurrentUser) -> User:
@@ -55,3 +207,143 @@ def get_current_active_superuser(current_user: CurrentUser) -> User:
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+async def get_current_active_superuser_async(current_user: AsyncCurrentUser) -> User:
+    return get_current_active_superuser(current_user)
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+M = TypeVar("M", bound=SQLModel)
+
+
+def _too_many_rows() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Too many rows, at most {settings.BULK_MAX_ITEMS} are accepted",
+    )
+
+
+def check_bulk_ids(ids: list[uuid.UUID] | None) -> None:
+    if ids is not None and len(ids) > settings.BULK_MAX_ITEMS:
+        raise _too_many_rows()
+
+
+async def _read_bulk_rows(request: Request) -> list[Any]:
+    """
+    Rows of a bulk request: the values of a JSON array, or the raw lines of an
+    NDJSON stream, which is read incrementally so oversized streams are
+    rejected early.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if media_type == NDJSON_MEDIA_TYPE:
+        lines: list[bytes] = []
+        pending = b""
+        async for chunk in request.stream():
+            *complete, pending = (pending + chunk).split(b"\n")
+            lines.extend(line for line in complete if line.strip())
+            if len(lines) > settings.BULK_MAX_ITEMS:
+                raise _too_many_rows()
+        if pending.strip():
+            lines.append(pending)
+        rows: list[Any] = lines
+    else:
+        try:
+            rows = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Body is not valid JSON")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=422, detail="Body must be a JSON array")
+    if len(rows) > settings.BULK_MAX_ITEMS:
+        raise _too_many_rows()
+    return rows
+
+
+def _row_errors(e: ValidationError) -> list[Any]:
+    return e.errors(include_url=False, include_context=False, include_input=False)
+
+
+def bulk_body(model: type[M]) -> Callable[[Request], Awaitable[list[M]]]:
+    """
+    Dependency validating a JSON array or NDJSON stream of model in one pass.
+    Invalid rows are reported together as a 422 with their index.
+    """
+
+    async def parse_bulk_body(request: Request) -> list[M]:
+        items: list[M] = []
+        errors: list[dict[str, Any]] = []
+        for index, row in enumerate(await _read_bulk_rows(request)):
+            try:
+                if isinstance(row, bytes):
+                    items.append(model.model_validate_json(row))
+                else:
+                    items.append(model.model_validate(row))
+            except ValidationError as e:
+                errors.append({"index": index, "errors": _row_errors(e)})
+        if errors:
+            raise HTTPException(status_code=422, detail=errors)
+        return items
+
+    return parse_bulk_body
+
+
+PlantsBulkDep = Annotated[list[PlantCreate], Depends(bulk_body(PlantCreate))]
+
+
+def csv_rows(file: BinaryIO, model: type[M]) -> Iterator[M]:
+    """
+    Rows of a CSV file with a header row, read incrementally and validated as
+    model, with empty cells as nulls. Once invalid rows are found no more rows
+    are yielded; they are raised together as a 422 with their line at the end
+    of the file, or after IMPORT_MAX_ERRORS of them.
+    """
+    reader = csv.DictReader(codecs.iterdecode(file, "utf-8-sig"))
+    errors: list[dict[str, Any]] = []
+    try:
+        for row in reader:
+            values = {key: value or None for key, value in row.items() if key}
+            try:
+                item = model.model_validate(values)
+            except ValidationError as e:
+                errors.append({"line": reader.line_num, "errors": _row_errors(e)})
+                if len(errors) >= settings.IMPORT_MAX_ERRORS:
+                    break
+                continue
+            if not errors:
+                yield item
+    except (UnicodeDecodeError, csv.Error):
+        raise HTTPException(status_code=422, detail="File is not a valid UTF-8 CSV")
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+
+def fields_query(model: type[SQLModel]) -> Callable[[str | None], list[str] | None]:
+    """
+    Dependency parsing ?fields=, the comma separated fields of model to
+    return, into field names in model order, None when every field is
+    returned. id is always returned.
+    """
+    names = list(model.model_fields)
+
+    def parse_fields(
+        fields: Annotated[
+            str | None, Query(description="Fields to return, e.g. id,name,date")
+        ] = None,
+    ) -> list[str] | None:
+        if fields is None:
+            return None
+        picked = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = picked.difference(names)
+        if unknown:
+            raise HTTPException(
+                status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+        return [name for name in names if name in picked or name == "id"]
+
+    return parse_fields
+
+
+PlantFieldsDep = Annotated[list[str] | None, Depends(fields_query(PlantPublic))]
+# Optional ?location=&life_cycle=... filters of plant listings
+PlantFiltersDep = Annotated[PlantFilters, Depends()]
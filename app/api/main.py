@@ -1,14 +1,55 @@
 from fastapi import APIRouter
+from fastapi.routing import APIRoute
 
-from app.api.routes import items, login, private, users, utils, plants
+from app.api.routes import (
+    items,
+    items_async,
+    login,
+    login_async,
+    plants,
+    plants_async,
+    private,
+    users,
+    users_async,
+    utils,
+)
 from app.core.config import settings
 
+
+def with_async_handlers(router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """
+    Copy of router where each route that async_router also defines (same path
+    and methods) is replaced by the async version, keeping the route order.
+    """
+    replacements = {
+        (route.path, frozenset(route.methods)): route
+        for route in async_router.routes
+        if isinstance(route, APIRoute)
+    }
+    merged = APIRouter()
+    merged.routes = [
+        replacements.get((route.path, frozenset(route.methods)), route)
+        if isinstance(route, APIRoute)
+        else route
+        for route in router.routes
+    ]
+    return merged
+
+
 api_router = APIRouter()
-api_router.include_router(login.router)
-api_router.include_router(users.router)
+if settings.ASYNC_DB:
+    api_router.include_router(with_async_handlers(login.router, login_async.router))
+    api_router.include_router(with_async_handlers(users.router, users_async.router))
+else:
+    api_router.include_router(login.router)
+    api_router.include_router(users.router)
 api_router.include_router(utils.router)
-api_router.include_router(items.router)
-api_router.include_router(plants.router)
+if settings.ASYNC_DB:
+    api_router.include_router(with_async_handlers(items.router, items_async.router))
+    api_router.include_router(with_async_handlers(plants.router, plants_async.router))
+else:
+    api_router.include_router(items.router)
+    api_router.include_router(plants.router)
 
 
 if settings.ENVIRONMENT == "local":
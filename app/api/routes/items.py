@@ -1,57 +1,134 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, HTTPException, Request
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
+from app import crud
+from app.api.deps import (
+    CurrentPrincipal,
+    CurrentUser,
+    ReadSessionDep,
+    SessionDep,
+    check_bulk_ids,
+)
+from app.core.etag import etag_matches, not_modified, row_etag
+from app.core.response_cache import response_cache
+from app.models import (
+    BulkResult,
+    Item,
+    ItemCreate,
+    ItemPublic,
+    ItemsBulkUpdate,
+    ItemsPublic,
+    ItemsSelection,
+    ItemUpdate,
+    Message,
+)
 
 router = APIRouter(prefix="/items", tags=["items"])
 
 
 @router.get("/", response_model=ItemsPublic)
 def read_items(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    request: Request,
+    session: ReadSessionDep,
+    current_user: CurrentPrincipal,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool = True,
 ) -> Any:
     """
-    Retrieve items.
+    Retrieve items, by offset (skip) or after the next_cursor of a previous page.
     """
 
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Item)
-        count = session.exec(count_statement).one()
-        statement = select(Item).offset(skip).limit(limit)
-        items = session.exec(statement).all()
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Item)
-            .where(Item.owner_id == current_user.id)
-        )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Item)
-            .where(Item.owner_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
-        )
-        items = session.exec(statement).all()
-
-    return ItemsPublic(data=items, count=count)
+    owner_id = None if current_user.is_superuser else current_user.id
+    cache_key = response_cache.key(request, "item", owner_id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
+    etag = crud.list_etag(
+        session=session, model=Item, owner_id=owner_id, variant=request.url.query
+    )
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag)
+    items, count, next_cursor = crud.get_page(
+        session=session,
+        model=Item,
+        owner_id=owner_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        include_count=include_count,
+    )
+    return response_cache.put(
+        cache_key,
+        ItemsPublic(data=items, count=count, next_cursor=next_cursor),
+        etag=etag,
+    )
+
+
+@router.patch("/bulk", response_model=BulkResult)
+def update_items(
+    *, session: SessionDep, current_user: CurrentUser, items_in: ItemsBulkUpdate
+) -> Any:
+    """
+    Apply one update to the items with the given ids, in a single statement.
+    Only your own items are updated unless you are a superuser.
+    """
+    check_bulk_ids(items_in.ids)
+    owner_id = None if current_user.is_superuser else current_user.id
+    ids = crud.bulk_update(
+        session=session,
+        model=Item,
+        criteria=crud.item_selection_criteria(items_in, owner_id),
+        values=items_in.update.model_dump(exclude_unset=True),
+    )
+    return BulkResult(ids=ids)
+
+
+@router.delete("/bulk", response_model=BulkResult)
+def delete_items(
+    *, session: SessionDep, current_user: CurrentUser, selection: ItemsSelection
+) -> Any:
+    """
+    Delete the items with the given ids, in a single statement.
+    Only your own items are deleted unless you are a superuser.
+    """
+    check_bulk_ids(selection.ids)
+    owner_id = None if current_user.is_superuser else current_user.id
+    ids = crud.bulk_delete(
+        session=session,
+        model=Item,
+        criteria=crud.item_selection_criteria(selection, owner_id),
+    )
+    return BulkResult(ids=ids)
 
 
 @router.get("/{id}", response_model=ItemPublic)
-def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+def read_item(
+    request: Request,
+    session: ReadSessionDep,
+    current_user: CurrentPrincipal,
+    id: uuid.UUID,
+) -> Any:
     """
     Get item by ID.
     """
+    owner_id = None if current_user.is_superuser else current_user.id
+    cache_key = response_cache.key(request, "item", owner_id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
     item = session.get(Item, id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    return item
+    etag = row_etag(item, list(ItemPublic.model_fields))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return response_cache.put(cache_key, ItemPublic.model_validate(item), etag=etag)
 
 
 @router.post("/", response_model=ItemPublic)
@@ -64,7 +141,6 @@ def create_item(
     item = Item.model_validate(item_in, update={"owner_id": current_user.id})
     session.add(item)
     session.commit()
-    session.refresh(item)
     return item
 
 
@@ -79,16 +155,18 @@ def update_item(
     """
     Update an item.
     """
-    item = session.get(Item, id)
+    owner_id = None if current_user.is_superuser else current_user.id
+    item = crud.update_owned(
+        session=session,
+        model=Item,
+        id=id,
+        owner_id=owner_id,
+        values=item_in.model_dump(exclude_unset=True),
+    )
     if not item:
+        if owner_id is not None and crud.row_exists(session=session, model=Item, id=id):
+            raise HTTPException(status_code=400, detail="Not enough permissions")
         raise HTTPException(status_code=404, detail="Item not found")
-    if not current_user.is_superuser and (item.owner_id != current_user.id):
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    update_dict = item_in.model_dump(exclude_unset=True)
-    item.sqlmodel_update(update_dict)
-    session.add(item)
-    session.commit()
-    session.refresh(item)
     return item
 
 
@@ -99,11 +177,9 @@ def delete_item(
     """
     Delete an item.
     """
-    item = session.get(Item, id)
-    if not item:
+    owner_id = None if current_user.is_superuser else current_user.id
+    if not crud.delete_owned(session=session, model=Item, id=id, owner_id=owner_id):
+        if owner_id is not None and crud.row_exists(session=session, model=Item, id=id):
+            raise HTTPException(status_code=400, detail="Not enough permissions")
         raise HTTPException(status_code=404, detail="Item not found")
-    if not current_user.is_superuser and (item.owner_id != current_user.id):
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    session.delete(item)
-    session.commit()
     return Message(message="Item deleted successfully")
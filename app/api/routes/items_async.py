@@ -0,0 +1,196 @@
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app import crud, crud_async
+from app.api.deps import (
+    AsyncCurrentPrincipal,
+    AsyncCurrentUser,
+    AsyncReadSessionDep,
+    AsyncSessionDep,
+    check_bulk_ids,
+)
+from app.core.etag import etag_matches, not_modified, row_etag
+from app.core.response_cache import response_cache
+from app.models import (
+    BulkResult,
+    Item,
+    ItemCreate,
+    ItemPublic,
+    ItemsBulkUpdate,
+    ItemsPublic,
+    ItemsSelection,
+    ItemUpdate,
+    Message,
+)
+
+# Async versions of the handlers in items.py, used when ASYNC_DB is enabled
+router = APIRouter(prefix="/items", tags=["items"])
+
+
+@router.get("/", response_model=ItemsPublic)
+async def read_items(
+    request: Request,
+    session: AsyncReadSessionDep,
+    current_user: AsyncCurrentPrincipal,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool = True,
+) -> Any:
+    """
+    Retrieve items, by offset (skip) or after the next_cursor of a previous page.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    cache_key = response_cache.key(request, "item", owner_id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
+    etag = await crud_async.list_etag(
+        session=session, model=Item, owner_id=owner_id, variant=request.url.query
+    )
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag)
+    items, count, next_cursor = await crud_async.get_page(
+        session=session,
+        model=Item,
+        owner_id=owner_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        include_count=include_count,
+    )
+    return response_cache.put(
+        cache_key,
+        ItemsPublic(data=items, count=count, next_cursor=next_cursor),
+        etag=etag,
+    )
+
+
+@router.patch("/bulk", response_model=BulkResult)
+async def update_items(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    items_in: ItemsBulkUpdate,
+) -> Any:
+    """
+    Apply one update to the items with the given ids, in a single statement.
+    Only your own items are updated unless you are a superuser.
+    """
+    check_bulk_ids(items_in.ids)
+    owner_id = None if current_user.is_superuser else current_user.id
+    ids = await crud_async.bulk_update(
+        session=session,
+        model=Item,
+        criteria=crud.item_selection_criteria(items_in, owner_id),
+        values=items_in.update.model_dump(exclude_unset=True),
+    )
+    return BulkResult(ids=ids)
+
+
+@router.delete("/bulk", response_model=BulkResult)
+async def delete_items(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    selection: ItemsSelection,
+) -> Any:
+    """
+    Delete the items with the given ids, in a single statement.
+    Only your own items are deleted unless you are a superuser.
+    """
+    check_bulk_ids(selection.ids)
+    owner_id = None if current_user.is_superuser else current_user.id
+    ids = await crud_async.bulk_delete(
+        session=session,
+        model=Item,
+        criteria=crud.item_selection_criteria(selection, owner_id),
+    )
+    return BulkResult(ids=ids)
+
+
+@router.get("/{id}", response_model=ItemPublic)
+async def read_item(
+    request: Request,
+    session: AsyncReadSessionDep,
+    current_user: AsyncCurrentPrincipal,
+    id: uuid.UUID,
+) -> Any:
+    """
+    Get item by ID.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    cache_key = response_cache.key(request, "item", owner_id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
+    item = await session.get(Item, id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    etag = row_etag(item, list(ItemPublic.model_fields))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return response_cache.put(cache_key, ItemPublic.model_validate(item), etag=etag)
+
+
+@router.post("/", response_model=ItemPublic)
+async def create_item(
+    *, session: AsyncSessionDep, current_user: AsyncCurrentUser, item_in: ItemCreate
+) -> Any:
+    """
+    Create new item.
+    """
+    return await crud_async.create_item(
+        session=session, item_in=item_in, owner_id=current_user.id
+    )
+
+
+@router.put("/{id}", response_model=ItemPublic)
+async def update_item(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    id: uuid.UUID,
+    item_in: ItemUpdate,
+) -> Any:
+    """
+    Update an item.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    item = await crud_async.update_owned(
+        session=session,
+        model=Item,
+        id=id,
+        owner_id=owner_id,
+        values=item_in.model_dump(exclude_unset=True),
+    )
+    if not item:
+        if owner_id is not None and await crud_async.row_exists(
+            session=session, model=Item, id=id
+        ):
+            raise HTTPException(status_code=400, detail="Not enough permissions")
+        raise HTTPException(status_code=404, detail="Item not found")
+    return item
+
+
+@router.delete("/{id}")
+async def delete_item(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID
+) -> Message:
+    """
+    Delete an item.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    if not await crud_async.delete_owned(
+        session=session, model=Item, id=id, owner_id=owner_id
+    ):
+        if owner_id is not None and await crud_async.row_exists(
+            session=session, model=Item, id=id
+        ):
+            raise HTTPException(status_code=400, detail="Not enough permissions")
+        raise HTTPException(status_code=404, detail="Item not found")
+    return Message(message="Item deleted successfully")
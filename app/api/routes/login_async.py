@@ -0,0 +1,70 @@
+from datetime import timedelta
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+
+from app import crud, crud_async
+from app.api.deps import AsyncCurrentPrincipal, AsyncSessionDep
+from app.core import security
+from app.core.config import settings
+from app.models import Message, NewPassword, Token, UserPublic
+from app.utils import verify_password_reset_token
+
+# Async versions of the handlers in login.py, used when ASYNC_DB is enabled
+router = APIRouter(tags=["login"])
+
+
+@router.post("/login/access-token")
+async def login_access_token(
+    session: AsyncSessionDep,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+) -> Token:
+    """
+    OAuth2 compatible token login, get an access token for future requests
+    """
+    user = await crud_async.authenticate(
+        session=session, email=form_data.username, password=form_data.password
+    )
+    if not user:
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+    elif not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return Token(
+        access_token=security.create_access_token(
+            user=user, expires_delta=access_token_expires
+        )
+    )
+
+
+@router.post("/login/test-token", response_model=UserPublic)
+async def test_token(current_user: AsyncCurrentPrincipal) -> Any:
+    """
+    Test access token
+    """
+    return current_user
+
+
+@router.post("/reset-password/")
+async def reset_password(session: AsyncSessionDep, body: NewPassword) -> Message:
+    """
+    Reset password
+    """
+    email = verify_password_reset_token(token=body.token)
+    if not email:
+        raise HTTPException(status_code=400, detail="Invalid token")
+    user = await crud_async.load_user_by_email(session=session, email=email)
+    if not user:
+        raise HTTPException(
+            status_code=404,
+            detail="The user with this email does not exist in the system.",
+        )
+    elif not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    session.info["user_id"] = user.id
+    user.hashed_password = await security.get_password_hash_async(body.new_password)
+    session.add(user)
+    await session.commit()
+    crud.invalidate_user(user.id)
+    return Message(message="Password updated successfully")
@@ -1,57 +1,315 @@
 import uuid
-from typing import Any, List
+from collections.abc import Iterator, Sequence
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlmodel import Session
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Plant, PlantCreate, PlantPublic, PlantsPublic, PlantUpdate, Message
+from app import crud
+from app.api.deps import (
+    NDJSON_MEDIA_TYPE,
+    CurrentPrincipal,
+    CurrentUser,
+    PlantFieldsDep,
+    PlantFiltersDep,
+    PlantsBulkDep,
+    ReadSessionDep,
+    SessionDep,
+    check_bulk_ids,
+    csv_rows,
+)
+from app.core.etag import etag_matches, not_modified, row_etag
+from app.core.response_cache import response_cache
+from app.core.responses import model_response
+from app.export import ExportFormat, csv_header, export_response, format_rows
+from app.models import (
+    BulkResult,
+    ImportResult,
+    Message,
+    Plant,
+    PlantCreate,
+    PlantFieldsPublic,
+    PlantNames,
+    PlantPublic,
+    PlantsBulkUpdate,
+    PlantsFieldsPublic,
+    PlantSort,
+    PlantsPublic,
+    PlantsSelection,
+    PlantUpdate,
+)
 
 router = APIRouter(prefix="/plants", tags=["plants"])
 
+# The body is parsed by PlantsBulkDep, so it is documented here
+BULK_PLANTS_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "array",
+                    "items": {"$ref": "#/components/schemas/PlantCreate"},
+                }
+            },
+            NDJSON_MEDIA_TYPE: {"schema": {"$ref": "#/components/schemas/PlantCreate"}},
+        },
+    }
+}
 
-@router.get("/", response_model=PlantsPublic)
+
+SearchQuery = Annotated[str, Query(min_length=3, max_length=100)]
+SearchLimit = Annotated[int, Query(ge=1, le=100)]
+PrefixQuery = Annotated[str, Query(min_length=1, max_length=100)]
+NamesLimit = Annotated[int, Query(ge=1, le=50)]
+
+
+def plant_fields(
+    plant: Plant, fields: list[str] | None
+) -> PlantPublic | PlantFieldsPublic:
+    if fields is None:
+        return PlantPublic.model_validate(plant)
+    # Only the picked attributes are read, the others may not be loaded
+    return PlantFieldsPublic.model_validate(
+        {name: getattr(plant, name) for name in fields}
+    )
+
+
+def plants_public(
+    plants: Sequence[Plant], fields: list[str] | None, **page: Any
+) -> PlantsPublic | PlantsFieldsPublic:
+    model = PlantsPublic if fields is None else PlantsFieldsPublic
+    return model(data=[plant_fields(plant, fields) for plant in plants], **page)
+
+
+def plant_load_options(fields: list[str] | None) -> list[ORMOption]:
+    if fields is None:
+        return []
+    # owner_id is needed to check permissions
+    return [load_only(Plant.owner_id, *(getattr(Plant, name) for name in fields))]
+
+
+@router.get("/", response_model=PlantsPublic, response_model_exclude_unset=True)
 def read_plants(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    request: Request,
+    session: ReadSessionDep,
+    current_user: CurrentPrincipal,
+    fields: PlantFieldsDep,
+    filters: PlantFiltersDep,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool = True,
+    sort: PlantSort = "id",
+) -> Any:
+    """
+    Retrieve plants, by offset (skip) or after the next_cursor of a previous page.
+    With fields, only those fields of each plant are loaded and returned, e.g.
+    list screens that do not show the notes can leave them out.
+    The plants can be filtered and sorted (descending with a leading "-"); a
+    cursor only continues the listing with the same filters and sort.
+    """
+
+    owner_id = None if current_user.is_superuser else current_user.id
+    cache_key = response_cache.key(request, "plant", owner_id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
+    etag = crud.list_etag(
+        session=session, model=Plant, owner_id=owner_id, variant=request.url.query
+    )
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag)
+    plants, count, next_cursor = crud.get_page(
+        session=session,
+        model=Plant,
+        owner_id=owner_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        include_count=include_count,
+        fields=fields,
+        criteria=crud.plant_filter_criteria(filters),
+        sort=sort,
+    )
+    return response_cache.put(
+        cache_key,
+        plants_public(plants, fields, count=count, next_cursor=next_cursor),
+        etag=etag,
+        exclude_unset=True,
+    )
+
+
+@router.post("/bulk", response_model=BulkResult, openapi_extra=BULK_PLANTS_OPENAPI)
+def create_plants(
+    *, session: SessionDep, current_user: CurrentUser, plants_in: PlantsBulkDep
+) -> Any:
+    """
+    Create many plants in one transaction from a JSON array or an NDJSON
+    stream (application/x-ndjson). Nothing is created if any row is invalid.
+    """
+    ids = crud.create_plants(
+        session=session, plants_in=plants_in, owner_id=current_user.id
+    )
+    return BulkResult(ids=ids)
+
+
+@router.patch("/bulk", response_model=BulkResult)
+def update_plants(
+    *, session: SessionDep, current_user: CurrentUser, plants_in: PlantsBulkUpdate
+) -> Any:
+    """
+    Apply one update to the plants with the given ids and matching the
+    given filters, in a single statement.
+    Only your own plants are updated unless you are a superuser.
+    """
+    check_bulk_ids(plants_in.ids)
+    owner_id = None if current_user.is_superuser else current_user.id
+    ids = crud.bulk_update(
+        session=session,
+        model=Plant,
+        criteria=crud.plant_selection_criteria(plants_in, owner_id),
+        values=plants_in.update.model_dump(exclude_unset=True),
+    )
+    return BulkResult(ids=ids)
+
+
+@router.delete("/bulk", response_model=BulkResult)
+def delete_plants(
+    *, session: SessionDep, current_user: CurrentUser, selection: PlantsSelection
 ) -> Any:
     """
-    Retrieve plants.
+    Delete the plants with the given ids and matching the
+    given filters, in a single statement.
+    Only your own plants are deleted unless you are a superuser.
     """
+    check_bulk_ids(selection.ids)
+    owner_id = None if current_user.is_superuser else current_user.id
+    ids = crud.bulk_delete(
+        session=session,
+        model=Plant,
+        criteria=crud.plant_selection_criteria(selection, owner_id),
+    )
+    return BulkResult(ids=ids)
 
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Plant)
-        count = session.exec(count_statement).one()
-        statement = select(Plant).offset(skip).limit(limit)
-        plants = session.exec(statement).all()
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Plant)
-            .where(Plant.owner_id == current_user.id)
-        )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Plant)
-            .where(Plant.owner_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
-        )
-        plants = session.exec(statement).all()
 
-    return PlantsPublic(data=plants, count=count)
+@router.post("/import", response_model=ImportResult)
+def import_plants(
+    *, session: SessionDep, current_user: CurrentUser, file: UploadFile
+) -> Any:
+    """
+    Create plants from a CSV file with a header row of plant fields, e.g.
+    saved from a spreadsheet. Nothing is created if any row is invalid.
+    """
+    count = crud.import_plants(
+        session=session,
+        plants_in=csv_rows(file.file, PlantCreate),
+        owner_id=current_user.id,
+    )
+    return ImportResult(count=count)
 
 
-@router.get("/{id}", response_model=PlantPublic)
-def read_plant(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+@router.get("/export", response_class=StreamingResponse)
+def export_plants(
+    session: ReadSessionDep,
+    current_user: CurrentPrincipal,
+    format: ExportFormat = "ndjson",
+) -> StreamingResponse:
     """
-    Get plant by ID.
+    Stream your plants, or all plants for a superuser, as NDJSON or CSV.
     """
-    plant = session.get(Plant, id)
+    owner_id = None if current_user.is_superuser else current_user.id
+    bind = session.get_bind()
+
+    def chunks() -> Iterator[str]:
+        # The request session is closed before the body is sent, so the rows
+        # are read by a session of the stream on the same database
+        with Session(bind) as export_session:
+            if format == "csv":
+                yield csv_header(PlantPublic)
+            for plants in crud.iter_plants(session=export_session, owner_id=owner_id):
+                yield format_rows(plants, PlantPublic, format)
+
+    return export_response(chunks(), format, "plants")
+
+
+@router.get("/search", response_model=PlantsPublic, response_model_exclude_unset=True)
+def search_plants(
+    session: ReadSessionDep,
+    current_user: CurrentPrincipal,
+    fields: PlantFieldsDep,
+    q: SearchQuery,
+    skip: int = 0,
+    limit: SearchLimit = 20,
+) -> Any:
+    """
+    Search your plants, or all plants for a superuser, for words similar to q
+    in their name, cultivar, location or notes, best matches first. There is
+    no count nor next_cursor, page with skip.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    plants = crud.search_plants(
+        session=session,
+        q=q,
+        owner_id=owner_id,
+        skip=skip,
+        limit=limit,
+        fields=fields,
+    )
+    return model_response(
+        plants_public(plants, fields, count=None),
+        exclude_unset=True,
+    )
+
+
+@router.get("/names", response_model=PlantNames)
+def read_plant_names(
+    session: ReadSessionDep,
+    current_user: CurrentPrincipal,
+    prefix: PrefixQuery,
+    limit: NamesLimit = 10,
+) -> Any:
+    """
+    Names of your plants (all plants for a superuser) starting with prefix,
+    ignoring case, for autocompletion.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    names = crud.get_plant_names(
+        session=session, prefix=prefix, owner_id=owner_id, limit=limit
+    )
+    return model_response(PlantNames(data=names))
+
+
+@router.get("/{id}", response_model=PlantPublic, response_model_exclude_unset=True)
+def read_plant(
+    request: Request,
+    session: ReadSessionDep,
+    current_user: CurrentPrincipal,
+    id: uuid.UUID,
+    fields: PlantFieldsDep,
+) -> Any:
+    """
+    Get plant by ID, with only the given fields if any.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    cache_key = response_cache.key(request, "plant", owner_id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
+    plant = session.get(Plant, id, options=plant_load_options(fields))
     if not plant:
         raise HTTPException(status_code=404, detail="Plant not found")
     if not current_user.is_superuser and (plant.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
-    return plant
+    etag = row_etag(plant, list(PlantPublic.model_fields) if fields is None else fields)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return response_cache.put(
+        cache_key, plant_fields(plant, fields), etag=etag, exclude_unset=True
+    )
 
 
 @router.post("/", response_model=PlantPublic)
@@ -64,7 +322,6 @@ def create_plant(
     plant = Plant.model_validate(plant_in, update={"owner_id": current_user.id})
     session.add(plant)
     session.commit()
-    session.refresh(plant)
     return plant
 
 
@@ -79,16 +336,20 @@ def update_plant(
     """
     Update a plant.
     """
-    plant = session.get(Plant, id)
+    owner_id = None if current_user.is_superuser else current_user.id
+    plant = crud.update_owned(
+        session=session,
+        model=Plant,
+        id=id,
+        owner_id=owner_id,
+        values=plant_in.model_dump(exclude_unset=True),
+    )
     if not plant:
+        if owner_id is not None and crud.row_exists(
+            session=session, model=Plant, id=id
+        ):
+            raise HTTPException(status_code=400, detail="Not enough permissions")
         raise HTTPException(status_code=404, detail="Plant not found")
-    if not current_user.is_superuser and (plant.owner_id != current_user.id):
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    update_dict = plant_in.model_dump(exclude_unset=True)
-    plant.sqlmodel_update(update_dict)
-    session.add(plant)
-    session.commit()
-    session.refresh(plant)
     return plant
 
 
@@ -99,11 +360,11 @@ def delete_plant(
     """
     Delete a plant.
     """
-    plant = session.get(Plant, id)
-    if not plant:
+    owner_id = None if current_user.is_superuser else current_user.id
+    if not crud.delete_owned(session=session, model=Plant, id=id, owner_id=owner_id):
+        if owner_id is not None and crud.row_exists(
+            session=session, model=Plant, id=id
+        ):
+            raise HTTPException(status_code=400, detail="Not enough permissions")
         raise HTTPException(status_code=404, detail="Plant not found")
-    if not current_user.is_superuser and (plant.owner_id != current_user.id):
-        raise HTTPException(status_code=400, detail="Not enough permissions")
-    session.delete(plant)
-    session.commit()
     return Message(message="Plant deleted successfully")
\ No newline at end of file
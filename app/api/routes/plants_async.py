@@ -0,0 +1,338 @@
+import uuid
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud, crud_async
+from app.api.deps import (
+    AsyncCurrentPrincipal,
+    AsyncCurrentUser,
+    AsyncReadSessionDep,
+    AsyncSessionDep,
+    PlantFieldsDep,
+    PlantFiltersDep,
+    PlantsBulkDep,
+    check_bulk_ids,
+    csv_rows,
+)
+from app.api.routes.plants import (
+    BULK_PLANTS_OPENAPI,
+    NamesLimit,
+    PrefixQuery,
+    SearchLimit,
+    SearchQuery,
+    plant_fields,
+    plant_load_options,
+    plants_public,
+)
+from app.core.etag import etag_matches, not_modified, row_etag
+from app.core.response_cache import response_cache
+from app.core.responses import model_response
+from app.export import ExportFormat, csv_header, export_response, format_rows
+from app.models import (
+    BulkResult,
+    ImportResult,
+    Message,
+    Plant,
+    PlantCreate,
+    PlantNames,
+    PlantPublic,
+    PlantsBulkUpdate,
+    PlantSort,
+    PlantsPublic,
+    PlantsSelection,
+    PlantUpdate,
+)
+
+# Async versions of the handlers in plants.py, used when ASYNC_DB is enabled
+router = APIRouter(prefix="/plants", tags=["plants"])
+
+
+@router.get("/", response_model=PlantsPublic, response_model_exclude_unset=True)
+async def read_plants(
+    request: Request,
+    session: AsyncReadSessionDep,
+    current_user: AsyncCurrentPrincipal,
+    fields: PlantFieldsDep,
+    filters: PlantFiltersDep,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    include_count: bool = True,
+    sort: PlantSort = "id",
+) -> Any:
+    """
+    Retrieve plants, by offset (skip) or after the next_cursor of a previous page.
+    With fields, only those fields of each plant are loaded and returned, e.g.
+    list screens that do not show the notes can leave them out.
+    The plants can be filtered and sorted (descending with a leading "-"); a
+    cursor only continues the listing with the same filters and sort.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    cache_key = response_cache.key(request, "plant", owner_id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
+    etag = await crud_async.list_etag(
+        session=session, model=Plant, owner_id=owner_id, variant=request.url.query
+    )
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag)
+    plants, count, next_cursor = await crud_async.get_page(
+        session=session,
+        model=Plant,
+        owner_id=owner_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        include_count=include_count,
+        fields=fields,
+        criteria=crud.plant_filter_criteria(filters),
+        sort=sort,
+    )
+    return response_cache.put(
+        cache_key,
+        plants_public(plants, fields, count=count, next_cursor=next_cursor),
+        etag=etag,
+        exclude_unset=True,
+    )
+
+
+@router.post("/bulk", response_model=BulkResult, openapi_extra=BULK_PLANTS_OPENAPI)
+async def create_plants(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    plants_in: PlantsBulkDep,
+) -> Any:
+    """
+    Create many plants in one transaction from a JSON array or an NDJSON
+    stream (application/x-ndjson). Nothing is created if any row is invalid.
+    """
+    ids = await crud_async.create_plants(
+        session=session, plants_in=plants_in, owner_id=current_user.id
+    )
+    return BulkResult(ids=ids)
+
+
+@router.patch("/bulk", response_model=BulkResult)
+async def update_plants(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    plants_in: PlantsBulkUpdate,
+) -> Any:
+    """
+    Apply one update to the plants with the given ids and matching the
+    given filters, in a single statement.
+    Only your own plants are updated unless you are a superuser.
+    """
+    check_bulk_ids(plants_in.ids)
+    owner_id = None if current_user.is_superuser else current_user.id
+    ids = await crud_async.bulk_update(
+        session=session,
+        model=Plant,
+        criteria=crud.plant_selection_criteria(plants_in, owner_id),
+        values=plants_in.update.model_dump(exclude_unset=True),
+    )
+    return BulkResult(ids=ids)
+
+
+@router.delete("/bulk", response_model=BulkResult)
+async def delete_plants(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    selection: PlantsSelection,
+) -> Any:
+    """
+    Delete the plants with the given ids and matching the
+    given filters, in a single statement.
+    Only your own plants are deleted unless you are a superuser.
+    """
+    check_bulk_ids(selection.ids)
+    owner_id = None if current_user.is_superuser else current_user.id
+    ids = await crud_async.bulk_delete(
+        session=session,
+        model=Plant,
+        criteria=crud.plant_selection_criteria(selection, owner_id),
+    )
+    return BulkResult(ids=ids)
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_plants(
+    *, session: AsyncSessionDep, current_user: AsyncCurrentUser, file: UploadFile
+) -> Any:
+    """
+    Create plants from a CSV file with a header row of plant fields, e.g.
+    saved from a spreadsheet. Nothing is created if any row is invalid.
+    """
+    count = await crud_async.import_plants(
+        session=session,
+        plants_in=csv_rows(file.file, PlantCreate),
+        owner_id=current_user.id,
+    )
+    return ImportResult(count=count)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_plants(
+    session: AsyncReadSessionDep,
+    current_user: AsyncCurrentPrincipal,
+    format: ExportFormat = "ndjson",
+) -> StreamingResponse:
+    """
+    Stream your plants, or all plants for a superuser, as NDJSON or CSV.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    bind = session.bind
+
+    async def chunks() -> AsyncIterator[str]:
+        async with AsyncSession(bind) as export_session:
+            if format == "csv":
+                yield csv_header(PlantPublic)
+            async for plants in crud_async.iter_plants(
+                session=export_session, owner_id=owner_id
+            ):
+                yield format_rows(plants, PlantPublic, format)
+
+    return export_response(chunks(), format, "plants")
+
+
+@router.get("/search", response_model=PlantsPublic, response_model_exclude_unset=True)
+async def search_plants(
+    session: AsyncReadSessionDep,
+    current_user: AsyncCurrentPrincipal,
+    fields: PlantFieldsDep,
+    q: SearchQuery,
+    skip: int = 0,
+    limit: SearchLimit = 20,
+) -> Any:
+    """
+    Search your plants, or all plants for a superuser, for words similar to q
+    in their name, cultivar, location or notes, best matches first. There is
+    no count nor next_cursor, page with skip.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    plants = await crud_async.search_plants(
+        session=session,
+        q=q,
+        owner_id=owner_id,
+        skip=skip,
+        limit=limit,
+        fields=fields,
+    )
+    return model_response(
+        plants_public(plants, fields, count=None),
+        exclude_unset=True,
+    )
+
+
+@router.get("/names", response_model=PlantNames)
+async def read_plant_names(
+    session: AsyncReadSessionDep,
+    current_user: AsyncCurrentPrincipal,
+    prefix: PrefixQuery,
+    limit: NamesLimit = 10,
+) -> Any:
+    """
+    Names of your plants (all plants for a superuser) starting with prefix,
+    ignoring case, for autocompletion.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    names = await crud_async.get_plant_names(
+        session=session, prefix=prefix, owner_id=owner_id, limit=limit
+    )
+    return model_response(PlantNames(data=names))
+
+
+@router.get("/{id}", response_model=PlantPublic, response_model_exclude_unset=True)
+async def read_plant(
+    request: Request,
+    session: AsyncReadSessionDep,
+    current_user: AsyncCurrentPrincipal,
+    id: uuid.UUID,
+    fields: PlantFieldsDep,
+) -> Any:
+    """
+    Get plant by ID, with only the given fields if any.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    cache_key = response_cache.key(request, "plant", owner_id)
+    cached = response_cache.get(request, cache_key)
+    if cached is not None:
+        return cached
+    plant = await session.get(Plant, id, options=plant_load_options(fields))
+    if not plant:
+        raise HTTPException(status_code=404, detail="Plant not found")
+    if not current_user.is_superuser and (plant.owner_id != current_user.id):
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    etag = row_etag(plant, list(PlantPublic.model_fields) if fields is None else fields)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return response_cache.put(
+        cache_key, plant_fields(plant, fields), etag=etag, exclude_unset=True
+    )
+
+
+@router.post("/", response_model=PlantPublic)
+async def create_plant(
+    *, session: AsyncSessionDep, current_user: AsyncCurrentUser, plant_in: PlantCreate
+) -> Any:
+    """
+    Create new plant.
+    """
+    return await crud_async.create_plant(
+        session=session, plant_in=plant_in, owner_id=current_user.id
+    )
+
+
+@router.put("/{id}", response_model=PlantPublic)
+async def update_plant(
+    *,
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    id: uuid.UUID,
+    plant_in: PlantUpdate,
+) -> Any:
+    """
+    Update a plant.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    plant = await crud_async.update_owned(
+        session=session,
+        model=Plant,
+        id=id,
+        owner_id=owner_id,
+        values=plant_in.model_dump(exclude_unset=True),
+    )
+    if not plant:
+        if owner_id is not None and await crud_async.row_exists(
+            session=session, model=Plant, id=id
+        ):
+            raise HTTPException(status_code=400, detail="Not enough permissions")
+        raise HTTPException(status_code=404, detail="Plant not found")
+    return plant
+
+
+@router.delete("/{id}")
+async def delete_plant(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser, id: uuid.UUID
+) -> Message:
+    """
+    Delete a plant.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    if not await crud_async.delete_owned(
+        session=session, model=Plant, id=id, owner_id=owner_id
+    ):
+        if owner_id is not None and await crud_async.row_exists(
+            session=session, model=Plant, id=id
+        ):
+            raise HTTPException(status_code=400, detail="Not enough permissions")
+        raise HTTPException(status_code=404, detail="Plant not found")
+    return Message(message="Plant deleted successfully")
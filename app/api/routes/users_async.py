@@ -0,0 +1,215 @@
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import col, delete
+
+from app import crud, crud_async
+from app.api.deps import (
+    AsyncCurrentPrincipal,
+    AsyncCurrentUser,
+    AsyncReadSessionDep,
+    AsyncSessionDep,
+    get_current_active_superuser_async,
+)
+from app.core.responses import model_response
+from app.core.security import get_password_hash_async, verify_password_async
+from app.models import (
+    Item,
+    Message,
+    UpdatePassword,
+    User,
+    UserCreate,
+    UserPublic,
+    UserRegister,
+    UsersPublic,
+    UserUpdate,
+    UserUpdateMe,
+)
+
+# Async versions of the handlers in users.py, used when ASYNC_DB is enabled
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get(
+    "/",
+    dependencies=[Depends(get_current_active_superuser_async)],
+    response_model=UsersPublic,
+)
+async def read_users(
+    session: AsyncReadSessionDep,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> Any:
+    """
+    Retrieve users, by offset (skip) or after the next_cursor of a previous page.
+    """
+
+    users, count, next_cursor = await crud_async.get_page(
+        session=session, model=User, cursor=cursor, skip=skip, limit=limit
+    )
+
+    return model_response(UsersPublic(data=users, count=count, next_cursor=next_cursor))
+
+
+@router.patch("/me", response_model=UserPublic)
+async def update_user_me(
+    *, session: AsyncSessionDep, user_in: UserUpdateMe, current_user: AsyncCurrentUser
+) -> Any:
+    """
+    Update own user.
+    """
+
+    if user_in.email:
+        existing_user = await crud_async.get_user_by_email(
+            session=session, email=user_in.email
+        )
+        if existing_user and existing_user.id != current_user.id:
+            raise HTTPException(
+                status_code=409, detail="User with this email already exists"
+            )
+    user_data = user_in.model_dump(exclude_unset=True)
+    current_user.sqlmodel_update(user_data)
+    session.add(current_user)
+    await session.commit()
+    await session.refresh(current_user)
+    crud.invalidate_user(current_user.id)
+    return current_user
+
+
+@router.patch("/me/password", response_model=Message)
+async def update_password_me(
+    *, session: AsyncSessionDep, body: UpdatePassword, current_user: AsyncCurrentUser
+) -> Any:
+    """
+    Update own password.
+    """
+    if not await verify_password_async(
+        body.current_password, current_user.hashed_password
+    ):
+        raise HTTPException(status_code=400, detail="Incorrect password")
+    if body.current_password == body.new_password:
+        raise HTTPException(
+            status_code=400, detail="New password cannot be the same as the current one"
+        )
+    current_user.hashed_password = await get_password_hash_async(body.new_password)
+    session.add(current_user)
+    await session.commit()
+    crud.invalidate_user(current_user.id)
+    return Message(message="Password updated successfully")
+
+
+@router.get("/me", response_model=UserPublic)
+async def read_user_me(current_user: AsyncCurrentPrincipal) -> Any:
+    """
+    Get current user.
+    """
+    return current_user
+
+
+@router.delete("/me", response_model=Message)
+async def delete_user_me(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser
+) -> Any:
+    """
+    Delete own user.
+    """
+    if current_user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="Super users are not allowed to delete themselves"
+        )
+    await session.delete(current_user)
+    await session.commit()
+    crud.invalidate_user(current_user.id)
+    return Message(message="User deleted successfully")
+
+
+@router.post("/signup", response_model=UserPublic)
+async def register_user(session: AsyncSessionDep, user_in: UserRegister) -> Any:
+    """
+    Create new user without the need to be logged in.
+    """
+    user = await crud_async.get_user_by_email(session=session, email=user_in.email)
+    if user:
+        raise HTTPException(
+            status_code=400,
+            detail="The user with this email already exists in the system",
+        )
+    user_create = UserCreate.model_validate(user_in)
+    return await crud_async.create_user(session=session, user_create=user_create)
+
+
+@router.get("/{user_id}", response_model=UserPublic)
+async def read_user_by_id(
+    user_id: uuid.UUID, session: AsyncSessionDep, current_user: AsyncCurrentUser
+) -> Any:
+    """
+    Get a specific user by id.
+    """
+    user = await session.get(User, user_id)
+    if user == current_user:
+        return user
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403,
+            detail="The user doesn't have enough privileges",
+        )
+    return user
+
+
+@router.patch(
+    "/{user_id}",
+    dependencies=[Depends(get_current_active_superuser_async)],
+    response_model=UserPublic,
+)
+async def update_user(
+    *,
+    session: AsyncSessionDep,
+    user_id: uuid.UUID,
+    user_in: UserUpdate,
+) -> Any:
+    """
+    Update a user.
+    """
+
+    db_user = await session.get(User, user_id)
+    if not db_user:
+        raise HTTPException(
+            status_code=404,
+            detail="The user with this id does not exist in the system",
+        )
+    if user_in.email:
+        existing_user = await crud_async.get_user_by_email(
+            session=session, email=user_in.email
+        )
+        if existing_user and existing_user.id != user_id:
+            raise HTTPException(
+                status_code=409, detail="User with this email already exists"
+            )
+
+    return await crud_async.update_user(
+        session=session, db_user=db_user, user_in=user_in
+    )
+
+
+@router.delete("/{user_id}", dependencies=[Depends(get_current_active_superuser_async)])
+async def delete_user(
+    session: AsyncSessionDep, current_user: AsyncCurrentUser, user_id: uuid.UUID
+) -> Message:
+    """
+    Delete a user.
+    """
+    user = await session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if user == current_user:
+        raise HTTPException(
+            status_code=403, detail="Super users are not allowed to delete themselves"
+        )
+    statement = delete(Item).where(col(Item.owner_id) == user_id)
+    await session.exec(statement)  # type: ignore
+    await session.delete(user)
+    await session.commit()
+    crud.invalidate_user(user_id)
+    return Message(message="User deleted successfully")
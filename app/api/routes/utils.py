@@ -1,7 +1,13 @@
+from typing import Any
+
 from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
+from app import crud
 from app.api.deps import get_current_active_superuser
+from app.core.db import pool_status
+from app.core.response_cache import response_cache
+from app.core.security import password_hasher
 from app.models import Message
 from app.utils import generate_test_email, send_email
 
@@ -29,3 +35,16 @@ def test_email(email_to: EmailStr) -> Message:
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
+
+
+@router.get("/metrics/", dependencies=[Depends(get_current_active_superuser)])
+def metrics() -> dict[str, Any]:
+    """
+    In-process runtime counters of this worker.
+    """
+    return {
+        "password_hasher": password_hasher.stats(),
+        "user_cache": crud.user_cache.stats(),
+        "response_cache": response_cache.backend.stats(),
+        "db_pool": pool_status(),
+    }
@@ -36,6 +36,35 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Build the user for read-only endpoints from the token claims instead of
+    # loading it from the database on every request. Needs the "postgres"
+    # CACHE_INVALIDATION_BACKEND, users are looked up while it is disconnected
+    AUTH_STATELESS_READS: bool = False
+    # bcrypt runs on its own executor; requests beyond workers + queue get a 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    # Per-process cache of user rows by id and email, 0 disables it
+    USER_CACHE_MAXSIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: float = 60
+    # Per-process cache of plant and item read responses of their owners, 0
+    # disables it
+    RESPONSE_CACHE_MAXSIZE: int = 1_000
+    RESPONSE_CACHE_TTL_SECONDS: float = 300
+    # Encode JSON responses with pydantic-core's Rust encoder rather than json.dumps
+    FAST_JSON_RESPONSES: bool = True
+    # Compress responses of at least COMPRESSION_MINIMUM_SIZE bytes with gzip,
+    # or Brotli when the brotli package is installed and the client accepts it
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1_000
+    GZIP_COMPRESS_LEVEL: int = 6  # 1-9
+    BROTLI_QUALITY: int = 4  # 0-11
+    # How in-process caches learn about writes made by other workers: "postgres"
+    # uses LISTEN/NOTIFY, "local" only sees writes made by this process
+    CACHE_INVALIDATION_BACKEND: Literal["local", "postgres"] = "postgres"
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"
+    CACHE_INVALIDATION_RECONNECT_SECONDS: float = 5
+    # Worker processes, also read by uvicorn when --workers is not given
+    WEB_CONCURRENCY: int = 1
     FRONTEND_HOST: str = "http://localhost:420"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
@@ -59,6 +88,54 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
+    # Optional streaming replica serving read-only endpoints, same credentials
+    POSTGRES_REPLICA_SERVER: str | None = None
+    POSTGRES_REPLICA_PORT: int | None = None
+    # Reads of a user who wrote within this window go to the primary
+    READ_YOUR_WRITES_SECONDS: float = 5
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def SQLALCHEMY_REPLICA_DATABASE_URI(self) -> PostgresDsn | None:
+        if not self.POSTGRES_REPLICA_SERVER:
+            return None
+        return MultiHostUrl.build(
+            scheme="postgresql+psycopg",
+            username=self.POSTGRES_USER,
+            password=self.POSTGRES_PASSWORD,
+            host=self.POSTGRES_REPLICA_SERVER,
+            port=self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT,
+            path=self.POSTGRES_DB,
+        )
+
+    # Connections per worker are DB_POOL_SIZE + DB_MAX_OVERFLOW at most
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Serve the plants, items, users and login routes from async handlers on
+    # an AsyncSession instead of sync handlers in the threadpool
+    ASYNC_DB: bool = False
+    # Requests running more SQL statements than this are logged as warnings,
+    # or fail outright when SQL_QUERY_BUDGET_STRICT is set (meant for tests)
+    SQL_QUERY_BUDGET: int | None = None
+    SQL_QUERY_BUDGET_STRICT: bool = False
+    # Maximum number of rows accepted by one bulk request
+    BULK_MAX_ITEMS: int = 1000
+    # Rows fetched per round trip of the server-side cursor of exports
+    EXPORT_BATCH_SIZE: int = 1000
+    # Invalid rows of an import reported before giving up on the file
+    IMPORT_MAX_ERRORS: int = 100
+    # Where the count of listings comes from: "counter" reads the per-owner
+    # ownercount table (plants and items only), "exact" runs COUNT(*) over the
+    # rows, "window" adds count(*) OVER () to the page query and "none" leaves
+    # count out. Clients can also skip it with include_count=false
+    LIST_COUNT_MODE: Literal["counter", "exact", "window", "none"] = "counter"
+    # Interval of the job fixing ownercount rows that drifted, 0 disables it
+    COUNTS_RECONCILE_INTERVAL_SECONDS: int = 600
+    # Interval of the pool status log line, 0 disables it
+    DB_POOL_LOG_INTERVAL_SECONDS: int = 60
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -112,6 +189,15 @@ class Settings(BaseSettings):
             else:
                 raise ValueError(message)
 
+    @model_validator(mode="after")
+    def _check_cache_invalidation(self) -> Self:
+        if self.CACHE_INVALIDATION_BACKEND == "local" and self.WEB_CONCURRENCY > 1:
+            raise ValueError(
+                'CACHE_INVALIDATION_BACKEND "local" does not reach other workers, '
+                'use "postgres" when WEB_CONCURRENCY is more than 1.'
+            )
+        return self
+
     @model_validator(mode="after")
     def _enforce_non_default_secrets(self) -> Self:
         self._check_default_secret("SECRET_KEY", self.SECRET_KEY)
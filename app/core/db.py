@@ -1,11 +1,313 @@
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from greenlet import getcurrent, greenlet
+from sqlalchemy import Engine, event, exc, inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import ORMExecuteState, SessionTransaction
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
 from sqlmodel import Session, create_engine, select
 from datetime import datetime, timedelta, timezone
 
+import app.counters  # noqa: F401  registers the ownercount session events
 from app import crud
+from app.core import security
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.models import Reminder, ReminderCreate, User, UserCreate, Plant, PlantCreate
+from app.core.invalidation import ALL_KEYS, bus
+from app.models import (
+    Reminder,
+    ReminderCreate,
+    User,
+    UserChange,
+    UserCreate,
+    Plant,
+    PlantCreate,
+)
+
+
+class PoolWaitStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.total_wait, 6),
+                "wait_seconds_avg": round(self.total_wait / self.checkouts, 6)
+                if self.checkouts
+                else 0.0,
+                "wait_seconds_max": round(self.max_wait, 6),
+            }
+
+
+pool_wait_stats = PoolWaitStats()
+replica_pool_wait_stats = PoolWaitStats()
+async_pool_wait_stats = PoolWaitStats()
+async_replica_pool_wait_stats = PoolWaitStats()
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+
+
+# Statements run on behalf of the current request, set by QueryStatsMiddleware
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(
+    _conn: Any,
+    _cursor: Any,
+    _statement: str,
+    _parameters: Any,
+    context: Any,
+    _executemany: bool,
+) -> None:
+    context._query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(
+    _conn: Any,
+    _cursor: Any,
+    _statement: str,
+    _parameters: Any,
+    context: Any,
+    _executemany: bool,
+) -> None:
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += time.perf_counter() - context._query_start
+
+
+class _TimedCheckout:
+    """
+    Pool mixin that records how long each checkout waited for a connection,
+    including the time to open a new one when the pool grows.
+    """
+
+    wait_stats: PoolWaitStats
+    # Checkouts in progress by greenlet rather than by thread, checkouts of the
+    # async engines share the event loop thread
+    _in_checkout: set[greenlet] = set()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        # QueuePool._do_get retries by calling itself, only time the outer call
+        current = getcurrent()
+        if current in self._in_checkout:
+            return super()._do_get()  # type: ignore[misc, no-any-return]
+        self._in_checkout.add(current)
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()  # type: ignore[misc, no-any-return]
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self._in_checkout.discard(current)
+            self.wait_stats.record(time.perf_counter() - start, timed_out)
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    wait_stats = pool_wait_stats
+
+
+class InstrumentedReplicaQueuePool(_TimedCheckout, QueuePool):
+    wait_stats = replica_pool_wait_stats
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    wait_stats = async_pool_wait_stats
+
+
+class InstrumentedAsyncReplicaQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    wait_stats = async_replica_pool_wait_stats
+
+
+pool_options: dict[str, Any] = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
+
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedQueuePool,
+    **pool_options,
+)
+
+# Used by the async route handlers when ASYNC_DB is enabled
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedAsyncQueuePool,
+    **pool_options,
+)
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+# Read-only endpoints use the replica when one is configured
+if settings.SQLALCHEMY_REPLICA_DATABASE_URI:
+    replica_engine = create_engine(
+        str(settings.SQLALCHEMY_REPLICA_DATABASE_URI),
+        poolclass=InstrumentedReplicaQueuePool,
+        **pool_options,
+    )
+    async_replica_engine = create_async_engine(
+        str(settings.SQLALCHEMY_REPLICA_DATABASE_URI),
+        poolclass=InstrumentedAsyncReplicaQueuePool,
+        **pool_options,
+    )
+else:
+    replica_engine = engine
+    async_replica_engine = async_engine
+
+
+# Users that committed a write recently, or whose rows someone else (e.g. a
+# superuser) wrote recently. Their reads must see it so they are pinned to the
+# primary until the replica has caught up and skip the response cache until
+# every worker has seen the write. Owners are published by
+# app.counters.publish_write.
+recent_writers: TTLCache[str, bool] = TTLCache(
+    maxsize=100_000, ttl=settings.READ_YOUR_WRITES_SECONDS
+)
+
+
+def wrote_recently(user_id: Any) -> bool:
+    return user_id is not None and recent_writers.get(str(user_id)) is not None
+
+
+def _record_recent_write(user_id: str) -> None:
+    recent_writers.set(user_id, True)
+
+
+bus.subscribe("recent_write", _record_recent_write)
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flush(session: Session, _flush_context: Any) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_bulk_write(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_recent_write(session: Session) -> None:
+    # The writer, session.info["user_id"] is set by the current user
+    # dependencies and the password reset
+    if session.info.pop("wrote", False) and "user_id" in session.info:
+        bus.publish("recent_write", str(session.info["user_id"]))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _clear_write_flag(session: Session, _previous: SessionTransaction) -> None:
+    session.info.pop("wrote", None)
+
+
+# User fields copied into the token claims by create_access_token
+TOKEN_CLAIM_FIELDS = ("email", "full_name", "is_superuser", "is_active")
+
+
+@event.listens_for(Session, "after_flush")
+def _record_user_changes(session: Session, _flush_context: Any) -> None:
+    changed = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    changed.update(
+        obj.id
+        for obj in session.dirty
+        if isinstance(obj, User)
+        and any(
+            inspect(obj).attrs[name].history.has_changes()
+            for name in TOKEN_CLAIM_FIELDS
+        )
+    )
+    if not changed:
+        return
+    now = datetime.now(timezone.utc)
+    statement = insert(UserChange).values(
+        [{"user_id": user_id, "changed_at": now} for user_id in sorted(changed)]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[UserChange.user_id],
+        set_={"changed_at": statement.excluded.changed_at},
+    )
+    session.connection().execute(statement)
+
+
+def _load_user_changes(user_id: str) -> None:
+    # Events were missed, the tokens distrusted by app.crud are trusted again
+    # once the changes made within a token lifetime are read back
+    if user_id != ALL_KEYS:
+        return
+    since = datetime.now(timezone.utc) - timedelta(
+        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+    )
+    with Session(engine) as session:
+        changes = session.exec(
+            select(UserChange).where(UserChange.changed_at > since)
+        ).all()
+    security.load_user_changes(
+        {str(change.user_id): change.changed_at.timestamp() for change in changes}
+    )
+
+
+# After app.crud's handler, which forgets the changes
+bus.subscribe("user", _load_user_changes)
+
+
+def _queue_pool_status(pool: Any, wait_stats: PoolWaitStats) -> dict[str, Any]:
+    assert isinstance(pool, QueuePool)
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        **wait_stats.snapshot(),
+    }
+
+
+def pool_status() -> dict[str, Any]:
+    status = _queue_pool_status(engine.pool, pool_wait_stats)
+    if replica_engine is not engine:
+        status["replica"] = _queue_pool_status(
+            replica_engine.pool, replica_pool_wait_stats
+        )
+    # The async engines serve the routes when ASYNC_DB is enabled
+    status["async"] = _queue_pool_status(
+        async_engine.sync_engine.pool, async_pool_wait_stats
+    )
+    if async_replica_engine is not async_engine:
+        status["async_replica"] = _queue_pool_status(
+            async_replica_engine.sync_engine.pool, async_replica_pool_wait_stats
+        )
+    return status
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -0,0 +1,36 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response
+from sqlmodel import SQLModel
+
+# Conditional GETs: responses carry an ETag computed from what they are built
+# from, so requests whose If-None-Match lists it get a 304 before anything is
+# serialized.
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    digest = hashlib.sha1(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def row_etag(row: SQLModel, fields: list[str]) -> str:
+    """Strong ETag of the representation of fields of row."""
+    return make_etag(
+        type(row).__name__, [(name, getattr(row, name)) for name in fields]
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match lists etag, compared weakly as for GET requests."""
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
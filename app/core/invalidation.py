@@ -0,0 +1,221 @@
+import json
+import logging
+import queue
+import threading
+import uuid
+from collections import defaultdict
+from collections.abc import Callable
+
+import psycopg
+from psycopg import sql
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Key sent to every handler when notifications may have been missed, i.e.
+# after the listener reconnects. Handlers should drop everything they cache.
+ALL_KEYS = "*"
+
+Handler = Callable[[str], None]
+
+
+class InvalidationBus:
+    """
+    Publishes "key of topic changed" events to in-process subscribers.
+
+    This in-memory implementation only reaches the current process; it is used
+    in tests and single-worker deployments.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: defaultdict[str, list[Handler]] = defaultdict(list)
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        self._handlers[topic].append(handler)
+
+    def publish(self, topic: str, key: str) -> None:
+        self._dispatch(topic, key)
+
+    @property
+    def connected(self) -> bool:
+        """
+        Whether events published by every worker reach this one. This bus
+        cannot tell whether it is the only worker, so it never claims to.
+        """
+        return False
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def _dispatch(self, topic: str, key: str) -> None:
+        for handler in self._handlers.get(topic, []):
+            try:
+                handler(key)
+            except Exception:
+                logger.exception("Invalidation handler failed for %s %s", topic, key)
+
+    def _dispatch_all(self) -> None:
+        for topic in list(self._handlers):
+            self._dispatch(topic, ALL_KEYS)
+
+
+class PostgresInvalidationBus(InvalidationBus):
+    """
+    Broadcasts events to every worker through Postgres LISTEN/NOTIFY.
+
+    Events are dispatched locally right away and queued; a publisher thread
+    sends them with pg_notify, so publishing never waits on the database. A
+    listener thread in each worker dispatches the events published by the
+    other workers.
+    """
+
+    def __init__(self, conninfo: str, channel: str) -> None:
+        super().__init__()
+        self.conninfo = conninfo
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        # Payloads waiting to be sent, None tells the publisher to stop
+        self._outbox: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        self._publisher: threading.Thread | None = None
+        self._publisher_lock = threading.Lock()
+        self._listening = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def connected(self) -> bool:
+        return self._listening.is_set()
+
+    def publish(self, topic: str, key: str) -> None:
+        if topic not in self._handlers:
+            # Every worker runs the same code, so nobody else subscribes either
+            return
+        super().publish(topic, key)
+        self._start_publisher()
+        self._outbox.put(
+            json.dumps({"origin": self.origin, "topic": topic, "key": key})
+        )
+
+    def start(self) -> None:
+        self._start_publisher()
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._listen, name="invalidation-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        with self._publisher_lock:
+            publisher, self._publisher = self._publisher, None
+        if publisher is not None:
+            # Queued after the pending events, which are sent first
+            self._outbox.put(None)
+            publisher.join(timeout=5)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _start_publisher(self) -> None:
+        with self._publisher_lock:
+            if self._publisher is None:
+                self._publisher = threading.Thread(
+                    target=self._send, name="invalidation-publisher", daemon=True
+                )
+                self._publisher.start()
+
+    def _next_batch(self) -> tuple[list[str], bool]:
+        """Queued payloads, waiting for one, and whether stop was requested."""
+        batch: list[str] = []
+        payload = self._outbox.get()
+        while payload is not None:
+            batch.append(payload)
+            try:
+                payload = self._outbox.get_nowait()
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _send(self) -> None:
+        conn: psycopg.Connection | None = None
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            while batch:
+                try:
+                    if conn is None or conn.closed:
+                        conn = psycopg.connect(self.conninfo, autocommit=True)
+                    with conn.cursor() as cursor:
+                        cursor.executemany(
+                            "SELECT pg_notify(%s, %s)",
+                            [(self.channel, payload) for payload in batch],
+                        )
+                    batch = []
+                except psycopg.Error:
+                    logger.exception("Could not publish %d invalidations", len(batch))
+                    if conn is not None:
+                        conn.close()
+                    conn = None
+                    if self._stopping.wait(
+                        settings.CACHE_INVALIDATION_RECONNECT_SECONDS
+                    ):
+                        break
+        if conn is not None:
+            conn.close()
+
+    def _listen(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                with psycopg.connect(self.conninfo, autocommit=True) as conn:
+                    conn.execute(
+                        sql.SQL("LISTEN {}").format(sql.Identifier(self.channel))
+                    )
+                    logger.info("Listening for cache invalidations on %s", self.channel)
+                    # Anything published before LISTEN, at startup or while we
+                    # were disconnected, was not received
+                    self._dispatch_all()
+                    self._listening.set()
+                    while not self._stopping.is_set():
+                        for notify in conn.notifies(timeout=1.0):
+                            self._handle_notify(notify.payload)
+            except psycopg.Error:
+                logger.exception("Invalidation listener lost its connection")
+                self._listening.clear()
+                self._stopping.wait(settings.CACHE_INVALIDATION_RECONNECT_SECONDS)
+        self._listening.clear()
+
+    def _handle_notify(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+            if event["origin"] == self.origin:
+                return
+            self._dispatch(event["topic"], event["key"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed invalidation payload %r", payload)
+
+
+def postgres_conninfo() -> str:
+    return psycopg.conninfo.make_conninfo(
+        host=settings.POSTGRES_SERVER,
+        port=settings.POSTGRES_PORT,
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        dbname=settings.POSTGRES_DB,
+    )
+
+
+def create_bus() -> InvalidationBus:
+    if settings.CACHE_INVALIDATION_BACKEND == "postgres":
+        return PostgresInvalidationBus(
+            conninfo=postgres_conninfo(), channel=settings.CACHE_INVALIDATION_CHANNEL
+        )
+    return InvalidationBus()
+
+
+bus = create_bus()
@@ -0,0 +1,160 @@
+import base64
+import uuid
+from collections.abc import Sequence
+from typing import Any, TypeVar
+
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import from_json, to_json
+from sqlalchemy import TypeDecorator, tuple_
+from sqlalchemy.orm import aliased, load_only
+from sqlmodel import func, select
+from sqlmodel.sql.expression import Select, SelectOfScalar
+
+T = TypeVar("T")
+
+# Listings are ordered by id, which every listed table has as its primary key
+# and, for owner listings, as the second column of the (owner_id, id) index.
+# A cursor is the id of the last row of the previous page, so following pages
+# are index range scans instead of offsets that get slower the deeper they go,
+# and rows inserted meanwhile do not shift the pages.
+#
+# Listings sorted by another column are ordered by it then by id, in the same
+# direction, and their cursors also carry the sort key of the last row.
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(last_id: uuid.UUID, key: Any = None) -> str:
+    data = last_id.bytes if key is None else last_id.bytes + to_json(key)
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _cursor_bytes(cursor: str) -> bytes:
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    except ValueError:
+        raise InvalidCursorError(cursor) from None
+
+
+def decode_cursor(cursor: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(bytes=_cursor_bytes(cursor))
+    except ValueError:
+        raise InvalidCursorError(cursor) from None
+
+
+def decode_sorted_cursor(cursor: str, sort_column: Any) -> tuple[Any, uuid.UUID]:
+    """Sort key, as a value of sort_column, and id of a sorted cursor."""
+    column_type = sort_column.type
+    if isinstance(column_type, TypeDecorator):
+        column_type = column_type.impl_instance
+    data = _cursor_bytes(cursor)
+    try:
+        last_id = uuid.UUID(bytes=data[:16])
+        key = TypeAdapter(column_type.python_type).validate_python(from_json(data[16:]))
+    except (ValueError, ValidationError):
+        raise InvalidCursorError(cursor) from None
+    return key, last_id
+
+
+def _seek(
+    statement: Any,
+    id_column: Any,
+    *,
+    sort_column: Any,
+    descending: bool,
+    cursor: str | None,
+    skip: int,
+    limit: int,
+) -> Any:
+    columns = [id_column] if sort_column is None else [sort_column, id_column]
+    statement = statement.order_by(
+        *(column.desc() if descending else column for column in columns)
+    ).limit(limit + 1)
+    if cursor is None:
+        return statement.offset(skip)
+    if sort_column is None:
+        last_id = decode_cursor(cursor)
+        after = id_column < last_id if descending else id_column > last_id
+    else:
+        # A row comparison, so an index on the sort column then id serves it
+        last = decode_sorted_cursor(cursor, sort_column)
+        row = tuple_(sort_column, id_column)
+        after = row < last if descending else row > last
+    return statement.where(after)
+
+
+def paginate(
+    statement: SelectOfScalar[T],
+    id_column: Any,
+    *,
+    cursor: str | None,
+    skip: int,
+    limit: int,
+    sort_column: Any = None,
+    descending: bool = False,
+) -> SelectOfScalar[T]:
+    """
+    Orders statement by id_column, or by sort_column then id_column, and
+    starts after cursor, or at skip when there is no cursor. One row more than
+    limit is fetched so split_page can tell whether there is a next page.
+    """
+    return _seek(
+        statement,
+        id_column,
+        sort_column=sort_column,
+        descending=descending,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+
+def paginate_with_total(
+    statement: SelectOfScalar[T],
+    model: Any,
+    *,
+    cursor: str | None,
+    skip: int,
+    limit: int,
+    fields: Sequence[str] | None = None,
+    sort: str | None = None,
+    descending: bool = False,
+) -> Select[tuple[T, int]]:
+    """
+    Like paginate, with the number of rows of statement as a second column
+    computed in the same query by count(*) OVER (). The cursor condition is
+    applied outside the window so it does not shrink the total. Only the
+    columns of fields are loaded when given; Postgres leaves the subquery
+    columns the outer query does not use out of the plan.
+    """
+    rows = statement.add_columns(func.count().over().label("total")).subquery()
+    row = aliased(model, rows)
+    paged = select(row, rows.c.total)
+    if fields is not None:
+        paged = paged.options(load_only(*(getattr(row, name) for name in fields)))
+    return _seek(
+        paged,
+        row.id,
+        sort_column=None if sort is None else getattr(row, sort),
+        descending=descending,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+
+def split_page(
+    rows: Sequence[T], limit: int, sort: str | None = None
+) -> tuple[list[T], str | None]:
+    """
+    Page of rows fetched with paginate and the cursor of the next page, which
+    carries the sort attribute of the last row when the rows are sorted by it.
+    """
+    if limit <= 0 or len(rows) <= limit:
+        return list(rows[: max(limit, 0)]), None
+    page = list(rows[:limit])
+    key = None if sort is None else getattr(page[-1], sort)
+    return page, encode_cursor(page[-1].id, key)  # type: ignore[attr-defined]
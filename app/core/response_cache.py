@@ -0,0 +1,156 @@
+import functools
+import itertools
+from collections.abc import Iterable
+from typing import Any, Protocol
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from sqlmodel import SQLModel
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db import wrote_recently
+from app.core.etag import etag_matches, not_modified
+from app.core.invalidation import ALL_KEYS, bus
+from app.core.responses import model_response
+
+# ETag (if any) and JSON body of a cached response
+Entry = tuple[str | None, bytes]
+
+
+class ResponseCacheBackend(Protocol):
+    """
+    Storage of a ResponseCache. A backend shared by workers must share the
+    generations too, and never hand out a generation twice for a scope.
+    """
+
+    def get(self, key: str) -> Entry | None: ...
+
+    def set(self, key: str, entry: Entry) -> None: ...
+
+    def generation(self, scope: str) -> int: ...
+
+    def bump(self, scope: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> dict[str, Any]: ...
+
+
+class LocalResponseCacheBackend:
+    """
+    In-process backend, bounded by evicting the least recently used entries.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.entries: TTLCache[str, Entry] = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Generations are drawn from one counter, so a scope whose generation
+        # was evicted gets a new one that no cached entry uses
+        self.generations: TTLCache[str, int] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._counter = itertools.count(1)
+
+    def get(self, key: str) -> Entry | None:
+        return self.entries.get(key)
+
+    def set(self, key: str, entry: Entry) -> None:
+        self.entries.set(key, entry)
+
+    def generation(self, scope: str) -> int:
+        generation = self.generations.get(scope)
+        if generation is None:
+            generation = next(self._counter)
+            self.generations.set(scope, generation)
+        return generation
+
+    def bump(self, scope: str) -> None:
+        self.generations.set(scope, next(self._counter))
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.generations.clear()
+
+    def stats(self) -> dict[str, Any]:
+        stats: dict[str, Any] = self.entries.stats()
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+class ResponseCache:
+    """
+    Serialized read responses of an owner's rows, keyed by the request and the
+    generation of the owner's rows of the topic. Every write event published
+    on the invalidation bus for the owner bumps the generation, so entries
+    of older generations are never read again and age out of the backend.
+
+    Reads across owners (superusers) are not cached, nor reads of an owner
+    whose rows were written recently, by them or anyone else, as the write
+    may not have reached this worker yet.
+    """
+
+    def __init__(self, backend: ResponseCacheBackend, topics: Iterable[str]) -> None:
+        self.backend = backend
+        for topic in topics:
+            bus.subscribe(topic, functools.partial(self._invalidate, topic))
+
+    @property
+    def enabled(self) -> bool:
+        return settings.RESPONSE_CACHE_MAXSIZE > 0 and (
+            settings.RESPONSE_CACHE_TTL_SECONDS > 0
+        )
+
+    def _invalidate(self, topic: str, owner_id: str) -> None:
+        if owner_id == ALL_KEYS:
+            self.backend.clear()
+        else:
+            self.backend.bump(f"{topic}:{owner_id}")
+
+    def key(self, request: Request, topic: str, owner_id: Any) -> str | None:
+        """
+        Key of the response to request, a read of the rows of topic owned by
+        owner_id. None when it is not cached. Take it before reading the rows,
+        so a write in between leaves the response under an old generation.
+        """
+        if owner_id is None or not self.enabled or wrote_recently(owner_id):
+            return None
+        scope = f"{topic}:{owner_id}"
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{scope}:{self.backend.generation(scope)}:{request.url.path}?{query}"
+
+    def get(self, request: Request, key: str | None) -> Response | None:
+        """Cached response to request, or a 304 if it has the cached ETag."""
+        entry = self.backend.get(key) if key is not None else None
+        if entry is None:
+            return None
+        etag, body = entry
+        if etag is not None and etag_matches(request, etag):
+            return not_modified(etag)
+        headers = {"ETag": etag} if etag is not None else None
+        return Response(body, media_type="application/json", headers=headers)
+
+    def put(
+        self,
+        key: str | None,
+        content: SQLModel,
+        *,
+        etag: str | None = None,
+        exclude_unset: bool = False,
+    ) -> Response:
+        """
+        Returns content serialized with its ETag, caching it under key unless
+        key is None.
+        """
+        headers = {"ETag": etag} if etag is not None else None
+        response = model_response(content, exclude_unset=exclude_unset, headers=headers)
+        if key is not None:
+            self.backend.set(key, (etag, response.body))
+        return response
+
+
+response_cache = ResponseCache(
+    LocalResponseCacheBackend(
+        maxsize=settings.RESPONSE_CACHE_MAXSIZE,
+        ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    ),
+    topics=("plant", "item"),
+)
@@ -0,0 +1,35 @@
+from collections.abc import Mapping
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+from sqlmodel import SQLModel
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded by pydantic-core's Rust serializer instead of
+    json.dumps. The output is the same compact UTF-8 JSON.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def model_response(
+    content: SQLModel,
+    *,
+    exclude_unset: bool = False,
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """
+    Response with content serialized straight to JSON. Returning it skips the
+    route's response_model, which would validate content (and every row in it)
+    a second time and encode it through plain dicts.
+    """
+    return Response(
+        content.model_dump_json(exclude_unset=exclude_unset),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -1,5 +1,10 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, TypeVar
 
 import jwt
 from passlib.context import CryptContext
@@ -12,10 +17,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 ALGORITHM = "HS256"
 
 
-def create_access_token(
-    user: Any, 
-    expires_delta: timedelta
-) -> str:
+def create_access_token(user: Any, expires_delta: timedelta) -> str:
     """
     Create a JWT access token with user fields.
     """
@@ -26,6 +28,8 @@ def create_access_token(
         "full_name": user.full_name,
         "email": user.email,
         "is_superuser": user.is_superuser,
+        "is_active": user.is_active,
+        "iat": datetime.now(timezone.utc),
     }
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -37,3 +41,140 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusyError(Exception):
+    pass
+
+
+class PasswordHasher:
+    """
+    Bounded executor dedicated to bcrypt so hashing bursts don't occupy the
+    threadpool FastAPI uses for every other sync endpoint. bcrypt releases the
+    GIL while hashing, so threads give real parallelism here.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hasher"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._max_pending_seen = 0
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise PasswordHasherBusyError()
+            self._pending += 1
+            self._max_pending_seen = max(self._max_pending_seen, self._pending)
+        return self._executor.submit(self._run, fn, *args)
+
+    def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self._completed += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "max_pending_seen": self._max_pending_seen,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.wrap_future(
+        password_hasher.submit(verify_password, plain_password, hashed_password)
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.wrap_future(
+        password_hasher.submit(get_password_hash, password)
+    )
+
+
+def get_password_hash_bounded(password: str) -> str:
+    """
+    get_password_hash run on the password hasher, for sync code outside the
+    event loop. The calling thread waits for it.
+    """
+    return password_hasher.submit(get_password_hash, password).result()
+
+
+def verify_password_bounded(plain_password: str, hashed_password: str) -> bool:
+    """Like get_password_hash_bounded, for verify_password."""
+    return password_hasher.submit(
+        verify_password, plain_password, hashed_password
+    ).result()
+
+
+# Last time (epoch seconds) each user's token claims changed, loaded from the
+# userchange table when the invalidation bus (re)connects and kept up to date
+# by its events. Claims in tokens issued before that moment can no longer be
+# trusted without a lookup, nor any claims before the changes are loaded.
+_user_changed_at: dict[str, float] = {}
+_user_changes_loaded = False
+_user_changed_lock = threading.Lock()
+
+
+def mark_user_changed(user_id: Any) -> None:
+    with _user_changed_lock:
+        _user_changed_at[str(user_id)] = time.time()
+
+
+def forget_user_changes() -> None:
+    """Distrusts every token until load_user_changes, e.g. after missed events."""
+    global _user_changes_loaded
+    with _user_changed_lock:
+        _user_changed_at.clear()
+        _user_changes_loaded = False
+
+
+def load_user_changes(changed_at: dict[str, float]) -> None:
+    """
+    Adds changed_at, by user id, to the changes marked since
+    forget_user_changes. It must hold every change made within a token
+    lifetime.
+    """
+    global _user_changes_loaded
+    with _user_changed_lock:
+        for user_id, at in changed_at.items():
+            _user_changed_at[user_id] = max(_user_changed_at.get(user_id, 0.0), at)
+        _user_changes_loaded = True
+
+
+def token_claims_are_fresh(sub: str, issued_at: int | None) -> bool:
+    """
+    Whether the user fields embedded in a token still match the database row.
+    """
+    if issued_at is None or not _user_changes_loaded:
+        return False
+    return issued_at > _user_changed_at.get(sub, 0.0)
@@ -0,0 +1,216 @@
+import uuid
+from collections import Counter
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+from sqlalchemy import Connection, event, inspect, literal, update
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.orm import SessionTransaction
+from sqlmodel import Session, func, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.core.config import settings
+from app.core.invalidation import bus
+from app.models import Item, OwnerCount, Plant, User
+
+# Tables whose rows are counted per owner in OwnerCount. Rows without an owner
+# are not counted.
+COUNTED_MODELS: tuple[type[Plant] | type[Item], ...] = (Plant, Item)
+
+# Advisory lock held by the reconciling transaction, every worker schedules
+# reconcile_counts but one at a time is enough
+RECONCILE_LOCK_KEY = 0x6F776E6572636E74
+
+
+def adjust_counts_statement(
+    table_name: str, deltas: Mapping[uuid.UUID, int]
+) -> Insert | None:
+    """
+    Statement adding deltas (by owner id) to the counters of table_name and
+    bumping their versions, None when there are no deltas. A delta of 0 records
+    a write that kept the count, e.g. an update. Writes that bypass the ORM
+    must run it in their transaction.
+    """
+    # Sorted so concurrent transactions lock the counter rows in the same order
+    rows = [
+        {"owner_id": owner_id, "table_name": table_name, "count": delta, "version": 1}
+        for owner_id, delta in sorted(deltas.items())
+    ]
+    if not rows:
+        return None
+    statement = insert(OwnerCount).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=[OwnerCount.owner_id, OwnerCount.table_name],
+        set_={
+            "count": OwnerCount.count + statement.excluded.count,
+            "version": OwnerCount.version + 1,
+        },
+    )
+
+
+def adjust_counts(
+    connection: Connection, table_name: str, deltas: Mapping[uuid.UUID, int]
+) -> None:
+    statement = adjust_counts_statement(table_name, deltas)
+    if statement is not None:
+        connection.execute(statement)
+
+
+@event.listens_for(Plant.owner_id, "set", active_history=True)
+@event.listens_for(Item.owner_id, "set", active_history=True)
+def _load_previous_owner(_target: Any, _value: Any, _old: Any, _initiator: Any) -> None:
+    # Listening with active_history loads the owner of an expired row before it
+    # is replaced, so _count_flushed_rows finds it in the attribute history
+    pass
+
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed_rows(session: Session, _flush_context: Any) -> None:
+    # Counter rows of deleted users go away with them (ON DELETE CASCADE)
+    deleted_owners = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    deltas: dict[str, Counter[uuid.UUID]] = {
+        model.__tablename__: Counter() for model in COUNTED_MODELS
+    }
+    changes: list[tuple[str, uuid.UUID | None, int]] = []
+    for sign, objects in ((1, session.new), (-1, session.deleted)):
+        changes.extend(
+            (obj.__tablename__, obj.owner_id, sign)
+            for obj in objects
+            if isinstance(obj, COUNTED_MODELS)
+        )
+    for obj in session.dirty:
+        if not isinstance(obj, COUNTED_MODELS) or not session.is_modified(obj):
+            continue
+        # A row given to another owner leaves the count of its previous owner
+        history = inspect(obj).attrs.owner_id.history
+        for owner_id in history.deleted:
+            changes.append((obj.__tablename__, owner_id, -1))
+        changes.append((obj.__tablename__, obj.owner_id, 1 if history.deleted else 0))
+    for table_name, owner_id, sign in changes:
+        if owner_id is not None and owner_id not in deleted_owners:
+            deltas[table_name][owner_id] += sign
+    if not any(deltas.values()):
+        return
+    written = session.info.setdefault("written_owners", set())
+    connection = session.connection()
+    for table_name, table_deltas in deltas.items():
+        adjust_counts(connection, table_name, table_deltas)
+        written.update((table_name, owner_id) for owner_id in table_deltas)
+
+
+def publish_write(table_name: str, owner_id: uuid.UUID) -> None:
+    """
+    Publishes a committed write to the rows of table_name owned by owner_id,
+    whoever wrote them: the owner becomes a recent writer, then the cached
+    reads of the rows are invalidated.
+    """
+    # In this order a read between the two is not cached from a lagging replica
+    bus.publish("recent_write", str(owner_id))
+    bus.publish(table_name, str(owner_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_written_owners(session: Session) -> None:
+    # Bulk writes that bypass the ORM publish their owners themselves
+    for table_name, owner_id in session.info.pop("written_owners", ()):
+        publish_write(table_name, owner_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _clear_written_owners(session: Session, _previous: SessionTransaction) -> None:
+    session.info.pop("written_owners", None)
+
+
+def list_count_statement(
+    model: Any, owner_id: uuid.UUID | None, criteria: Sequence[Any] = ()
+) -> SelectOfScalar[int] | None:
+    """
+    Statement counting the rows of model owned by owner_id, or all of them when
+    owner_id is None, that match criteria, as configured by LIST_COUNT_MODE.
+    None when counts are turned off.
+
+    In "counter" mode an owner's count is a primary key lookup. The total
+    across owners (which includes rows without an owner), tables without
+    counters, filtered listings and "window" mode (which only needs a separate
+    count past the last page) use COUNT(*).
+    """
+    if settings.LIST_COUNT_MODE == "none":
+        return None
+    if (
+        settings.LIST_COUNT_MODE != "counter"
+        or model not in COUNTED_MODELS
+        or criteria
+        or owner_id is None
+    ):
+        statement = select(func.count()).select_from(model).where(*criteria)
+        if owner_id is not None:
+            statement = statement.where(model.owner_id == owner_id)
+        return statement
+    # No counter row until the owner's first row
+    return select(func.coalesce(func.sum(OwnerCount.count), 0)).where(
+        OwnerCount.table_name == model.__tablename__,
+        OwnerCount.owner_id == owner_id,
+    )
+
+
+def list_version_statement(model: Any, owner_id: uuid.UUID) -> SelectOfScalar[int]:
+    """Statement reading the version of the rows of model owned by owner_id."""
+    return select(OwnerCount.version).where(
+        OwnerCount.owner_id == owner_id,
+        OwnerCount.table_name == model.__tablename__,
+    )
+
+
+def reconcile_counts(session: Session) -> int:
+    """
+    Rewrites the counters that drifted from the actual row counts, e.g. after
+    writes that bypassed the ORM, and returns how many counter rows changed.
+    Counters of owners without rows are zeroed rather than deleted so their
+    versions keep increasing. Returns 0 while another worker reconciles.
+    """
+    changed = 0
+    for model in COUNTED_MODELS:
+        table_name = model.__tablename__
+        locked = session.execute(
+            select(func.pg_try_advisory_xact_lock(RECONCILE_LOCK_KEY))
+        ).scalar_one()
+        if not locked:
+            session.rollback()
+            break
+        # Writes in progress hold their counter rows until they commit, the
+        # counts below are taken after them and later writes wait for ours
+        session.execute(
+            select(OwnerCount.owner_id)
+            .where(OwnerCount.table_name == table_name)
+            .order_by(OwnerCount.owner_id)
+            .with_for_update()
+        )
+        actual = (
+            select(model.owner_id, literal(table_name), func.count())
+            .where(model.owner_id.is_not(None))  # type: ignore[union-attr]
+            .group_by(model.owner_id)
+        )
+        # rowcount of an INSERT is only kept when asked for
+        upsert = (
+            insert(OwnerCount)
+            .from_select(["owner_id", "table_name", "count"], actual)
+            .execution_options(preserve_rowcount=True)
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[OwnerCount.owner_id, OwnerCount.table_name],
+            set_={"count": upsert.excluded.count, "version": OwnerCount.version + 1},
+            where=OwnerCount.count != upsert.excluded.count,
+        )
+        changed += session.execute(upsert).rowcount
+        orphans = (
+            update(OwnerCount)
+            .where(
+                OwnerCount.table_name == table_name,
+                OwnerCount.count != 0,
+                ~select(model.id).where(model.owner_id == OwnerCount.owner_id).exists(),
+            )
+            .values(count=0, version=OwnerCount.version + 1)
+        )
+        changed += session.execute(orphans).rowcount
+        session.commit()
+    return changed
@@ -1,57 +1,307 @@
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
 from datetime import datetime
 import uuid
 from typing import Any
 
-from sqlmodel import Session, select
+from sqlalchemy import (
+    ARRAY,
+    Column,
+    Insert,
+    MetaData,
+    Row,
+    Table,
+    Uuid,
+    any_,
+    delete,
+    insert,
+    literal,
+    or_,
+    update,
+)
+from sqlalchemy.orm import load_only, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from sqlmodel import Session, func, select
+from sqlmodel.sql.expression import SelectOfScalar
 
-from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, Reminder, ReminderCreate, ReminderUpdate, User, UserCreate, UserUpdate, Plant, PlantCreate, PlantUpdate
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.etag import make_etag
+from app.core.invalidation import ALL_KEYS, bus
+from app.core.pagination import paginate, paginate_with_total, split_page
+from app.core.security import (
+    forget_user_changes,
+    get_password_hash_bounded,
+    mark_user_changed,
+    verify_password_bounded,
+)
+from app.counters import (
+    adjust_counts,
+    adjust_counts_statement,
+    list_count_statement,
+    list_version_statement,
+    publish_write,
+)
+from app.models import Item, ItemCreate, ItemsSelection, PlantFilters, PlantsSelection, Reminder, ReminderCreate, ReminderUpdate, User, UserCreate, UserUpdate, Plant, PlantCreate, PlantUpdate
 
+# Column values of recently loaded users keyed by id, and user ids by email.
+user_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    maxsize=settings.USER_CACHE_MAXSIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+user_id_by_email_cache: TTLCache[str, str] = TTLCache(
+    maxsize=settings.USER_CACHE_MAXSIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
 
-def create_user(*, session: Session, user_create: UserCreate) -> User:
+
+def cache_user(user: User) -> None:
+    user_cache.set(str(user.id), user.model_dump())
+    user_id_by_email_cache.set(user.email, str(user.id))
+
+
+def user_from_cache(session: Session, data: dict[str, Any]) -> User:
+    # Attach a fresh instance as if it had just been loaded, so the request can
+    # still modify or delete it without an extra SELECT
+    existing = session.identity_map.get(identity_key(User, data["id"]))
+    if existing is not None:
+        return existing  # type: ignore[no-any-return]
+    user = User(**data)
+    make_transient_to_detached(user)
+    session.add(user)
+    return user
+
+
+def _evict_user(user_id: str) -> None:
+    if user_id == ALL_KEYS:
+        user_cache.clear()
+        # Reloaded by app.core.db from the userchange table
+        forget_user_changes()
+    else:
+        user_cache.invalidate(user_id)
+        mark_user_changed(user_id)
+
+
+bus.subscribe("user", _evict_user)
+
+
+def invalidate_user(user_id: uuid.UUID | str) -> None:
+    """
+    Forget cached copies of a user, in every worker, after its row was updated
+    or deleted.
+    """
+    bus.publish("user", str(user_id))
+
+
+def get_user(*, session: Session, user_id: uuid.UUID | str) -> User | None:
+    data = user_cache.get(str(user_id))
+    if data is not None:
+        return user_from_cache(session, data)
+    return load_user(session=session, user_id=user_id)
+
+
+def load_user(*, session: Session, user_id: uuid.UUID | str) -> User | None:
+    """
+    The user as stored in the database, skipping the cache, whose copy may
+    be stale if an invalidation was missed. The cached copy is refreshed.
+    """
+    user = session.get(User, user_id)
+    if user:
+        cache_user(user)
+    return user
+
+
+def create_user(
+    *, session: Session, user_create: UserCreate, hashed_password: str | None = None
+) -> User:
+    # Handlers on the event loop hash with get_password_hash_async beforehand
+    if hashed_password is None:
+        hashed_password = get_password_hash_bounded(user_create.password)
     db_obj = User.model_validate(
-        user_create, update={"hashed_password": get_password_hash(user_create.password)}
+        user_create, update={"hashed_password": hashed_password}
     )
     session.add(db_obj)
     session.commit()
-    session.refresh(db_obj)
     return db_obj
 
 
-def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
+def update_user(
+    *,
+    session: Session,
+    db_user: User,
+    user_in: UserUpdate,
+    hashed_password: str | None = None,
+) -> Any:
     user_data = user_in.model_dump(exclude_unset=True)
     extra_data = {}
     if "password" in user_data:
-        password = user_data["password"]
-        hashed_password = get_password_hash(password)
+        if hashed_password is None:
+            hashed_password = get_password_hash_bounded(user_data["password"])
         extra_data["hashed_password"] = hashed_password
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
     session.commit()
     session.refresh(db_user)
+    invalidate_user(db_user.id)
     return db_user
 
 
 def get_user_by_email(*, session: Session, email: str) -> User | None:
+    user_id = user_id_by_email_cache.get(email)
+    if user_id is not None:
+        data = user_cache.get(user_id)
+        if data is not None and data["email"] == email:
+            return user_from_cache(session, data)
+    return load_user_by_email(session=session, email=email)
+
+
+def load_user_by_email(*, session: Session, email: str) -> User | None:
+    """Like load_user, for checking credentials."""
     statement = select(User).where(User.email == email)
     session_user = session.exec(statement).first()
+    if session_user:
+        cache_user(session_user)
     return session_user
 
 
 def authenticate(*, session: Session, email: str, password: str) -> User | None:
-    db_user = get_user_by_email(session=session, email=email)
+    db_user = load_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    if not verify_password_bounded(password, db_user.hashed_password):
         return None
     return db_user
 
 
+def parse_sort(
+    sort: str, fields: Sequence[str] | None
+) -> tuple[str | None, bool, Sequence[str] | None]:
+    """
+    Attribute (None for id) and direction of a sort such as "-date", and the
+    fields to load, which must include the attribute for the next cursor.
+    """
+    name = sort.removeprefix("-")
+    attribute = None if name == "id" else name
+    if fields is not None and attribute is not None and attribute not in fields:
+        fields = [*fields, attribute]
+    return attribute, sort.startswith("-"), fields
+
+
+def page_statements(
+    *,
+    model: Any,
+    owner_id: uuid.UUID | None = None,
+    cursor: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    include_count: bool = True,
+    fields: Sequence[str] | None = None,
+    criteria: Sequence[Any] = (),
+    sort: str = "id",
+) -> tuple[Any, Any | None, str | None]:
+    """
+    Statements run by get_page: the page, which carries the total as a
+    second column when it is counted in window mode, and the count, with the
+    attribute the page is sorted by.
+    """
+    sort_attribute, descending, fields = parse_sort(sort, fields)
+    statement = select(model).where(*criteria)
+    if owner_id is not None:
+        statement = statement.where(model.owner_id == owner_id)
+    count_statement = (
+        list_count_statement(model, owner_id, criteria) if include_count else None
+    )
+    if count_statement is not None and settings.LIST_COUNT_MODE == "window":
+        statement = paginate_with_total(
+            statement,
+            model,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+            fields=fields,
+            sort=sort_attribute,
+            descending=descending,
+        )
+        return statement, count_statement, sort_attribute
+    statement = paginate(
+        statement,
+        model.id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        sort_column=None if sort_attribute is None else getattr(model, sort_attribute),
+        descending=descending,
+    )
+    # Without fields every column is loaded, the full response renders them
+    # all (deferring e.g. plant notes would load them again row by row)
+    if fields is not None:
+        statement = statement.options(load_only(*(getattr(model, f) for f in fields)))
+    return statement, count_statement, sort_attribute
+
+
+def get_page(
+    *,
+    session: Session,
+    model: Any,
+    owner_id: uuid.UUID | None = None,
+    cursor: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    include_count: bool = True,
+    fields: Sequence[str] | None = None,
+    criteria: Sequence[Any] = (),
+    sort: str = "id",
+) -> tuple[list[Any], int | None, str | None]:
+    """
+    Page of the rows of model owned by owner_id (all of them when None) that
+    match criteria, ordered by sort, with the count of those rows (see
+    LIST_COUNT_MODE) and the next page cursor. Only the columns of fields are
+    loaded when given.
+    """
+    statement, count_statement, sort_attribute = page_statements(
+        model=model,
+        owner_id=owner_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        include_count=include_count,
+        fields=fields,
+        criteria=criteria,
+        sort=sort,
+    )
+    if count_statement is not None and settings.LIST_COUNT_MODE == "window":
+        rows = session.exec(statement).all()
+        page, next_cursor = split_page([row[0] for row in rows], limit, sort_attribute)
+        if rows:
+            return page, rows[0][1], next_cursor
+        # Past the last row there is no row to carry the total
+        return page, session.exec(count_statement).one(), next_cursor
+    page, next_cursor = split_page(session.exec(statement).all(), limit, sort_attribute)
+    count = None
+    if count_statement is not None:
+        count = session.exec(count_statement).one()
+    return page, count, next_cursor
+
+
+def list_etag(
+    *, session: Session, model: Any, owner_id: uuid.UUID | None, variant: str
+) -> str | None:
+    """
+    Weak ETag of the listing of the rows of model owned by owner_id, changing
+    with every write to them; variant tells the representations apart (the
+    query string). None for listings across owners, which have no version.
+
+    Compute it before reading the page: a write in between then leaves a stale
+    ETag, which only costs a refetch, rather than a stale page.
+    """
+    if owner_id is None:
+        return None
+    version = session.exec(list_version_statement(model, owner_id)).first()
+    return make_etag(model.__tablename__, owner_id, version or 0, variant, weak=True)
+
+
 def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -> Item:
     db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
     session.add(db_item)
     session.commit()
-    session.refresh(db_item)
     return db_item
 
 
@@ -60,17 +310,354 @@ def create_plant(*, session: Session, plant_in: PlantCreate, owner_id: uuid.UUID
     db_plant = Plant.model_validate(plant_in, update={"owner_id": owner_id})
     session.add(db_plant)
     session.commit()
-    session.refresh(db_plant)
     return db_plant
 
 
+def plant_rows(
+    plants_in: list[PlantCreate], owner_id: uuid.UUID
+) -> list[dict[str, Any]]:
+    return [
+        {**plant_in.model_dump(), "id": uuid.uuid4(), "owner_id": owner_id}
+        for plant_in in plants_in
+    ]
+
+
+def create_plants(
+    *, session: Session, plants_in: list[PlantCreate], owner_id: uuid.UUID
+) -> list[uuid.UUID]:
+    """
+    Inserts plants in one transaction with batched multi-row INSERTs, without
+    loading them back, and returns their ids.
+    """
+    rows = plant_rows(plants_in, owner_id)
+    if rows:
+        session.execute(insert(Plant), rows)
+        adjust_counts(session.connection(), "plant", {owner_id: len(rows)})
+        session.commit()
+        publish_write("plant", owner_id)
+    return [row["id"] for row in rows]
+
+
+def plant_staging_table() -> Table:
+    """Temporary table with the columns of plant, dropped on commit."""
+    return Table(
+        "plant_import",
+        MetaData(),
+        *(Column(c.name, c.type) for c in Plant.__table__.columns),  # type: ignore[attr-defined]
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+
+
+def copy_statement(table: Table) -> str:
+    return f"COPY {table.name} ({', '.join(table.columns.keys())}) FROM STDIN"
+
+
+def plant_copy_rows(
+    plants_in: Iterable[PlantCreate], owner_id: uuid.UUID, table: Table
+) -> Iterator[list[Any]]:
+    columns = table.columns.keys()
+    for plant_in in plants_in:
+        row = {**plant_in.model_dump(), "id": uuid.uuid4(), "owner_id": owner_id}
+        yield [row[column] for column in columns]
+
+
+def merge_staging_statement(table: Table) -> Insert:
+    # rowcount of an INSERT is only kept when asked for
+    return (
+        insert(Plant)
+        .from_select(table.columns.keys(), table.select())
+        .execution_options(preserve_rowcount=True)
+    )
+
+
+def import_plants(
+    *, session: Session, plants_in: Iterable[PlantCreate], owner_id: uuid.UUID
+) -> int:
+    """
+    Creates plants by COPYing them into a staging table while plants_in is
+    consumed, then moving them to plant with one INSERT ... SELECT, and
+    returns how many were created. Nothing is created if plants_in raises.
+    """
+    staging = plant_staging_table()
+    connection = session.connection()
+    staging.create(connection)
+    driver_connection = connection.connection.driver_connection
+    with driver_connection.cursor() as cursor:  # type: ignore[union-attr]
+        with cursor.copy(copy_statement(staging)) as copy:
+            for row in plant_copy_rows(plants_in, owner_id, staging):
+                copy.write_row(row)
+    count = session.execute(merge_staging_statement(staging)).rowcount
+    adjust_counts(connection, "plant", {owner_id: count})
+    session.commit()
+    if count:
+        publish_write("plant", owner_id)
+    return count
+
+
+def id_in(column: Any, ids: list[uuid.UUID]) -> Any:
+    """column = ANY(:ids), a single array parameter whatever the number of ids."""
+    return column == any_(literal(ids, ARRAY(Uuid)))
+
+
+def plant_selection_criteria(
+    selection: PlantsSelection, owner_id: uuid.UUID | None
+) -> list[Any]:
+    criteria = []
+    if owner_id is not None:
+        criteria.append(Plant.owner_id == owner_id)
+    if selection.ids is not None:
+        criteria.append(id_in(Plant.id, selection.ids))
+    if selection.location is not None:
+        criteria.append(Plant.location == selection.location)
+    if selection.life_cycle is not None:
+        criteria.append(Plant.life_cycle == selection.life_cycle)
+    if selection.planted_before is not None:
+        criteria.append(Plant.date < selection.planted_before)
+    return criteria
+
+
+def plant_filter_criteria(filters: PlantFilters) -> list[Any]:
+    criteria = []
+    if filters.location is not None:
+        criteria.append(Plant.location == filters.location)
+    if filters.life_cycle is not None:
+        criteria.append(Plant.life_cycle == filters.life_cycle)
+    if filters.cultivar is not None:
+        criteria.append(Plant.cultivar == filters.cultivar)
+    if filters.date_from is not None:
+        criteria.append(Plant.date >= filters.date_from)
+    if filters.date_to is not None:
+        criteria.append(Plant.date <= filters.date_to)
+    if filters.maturity_before is not None:
+        # date + integer is a date in Postgres
+        maturity = Plant.date + Plant.days_to_maturity
+        criteria.append(maturity <= filters.maturity_before)
+    return criteria
+
+
+def item_selection_criteria(
+    selection: ItemsSelection, owner_id: uuid.UUID | None
+) -> list[Any]:
+    criteria = [id_in(Item.id, selection.ids)]
+    if owner_id is not None:
+        criteria.append(Item.owner_id == owner_id)
+    return criteria
+
+
+def bulk_update_statement(
+    model: Any, criteria: list[Any], values: dict[str, Any]
+) -> Any:
+    if not values:
+        # Nothing to change, report the rows that would have been updated
+        return select(model.id, model.owner_id).where(*criteria)
+    return (
+        update(model)
+        .where(*criteria)
+        .values(values)
+        .returning(model.id, model.owner_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bulk_delete_statement(model: Any, criteria: list[Any]) -> Any:
+    return (
+        delete(model)
+        .where(*criteria)
+        .returning(model.id, model.owner_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bulk_counts_statement(model: Any, rows: Sequence[Row[Any]], row_delta: int) -> Any:
+    """Counter adjustment for the rows written by a bulk statement."""
+    deltas = Counter(row.owner_id for row in rows if row.owner_id is not None)
+    return adjust_counts_statement(
+        model.__tablename__, {owner_id: n * row_delta for owner_id, n in deltas.items()}
+    )
+
+
+def publish_bulk_write(model: Any, rows: Sequence[Row[Any]]) -> list[uuid.UUID]:
+    for owner_id in {row.owner_id for row in rows if row.owner_id is not None}:
+        publish_write(model.__tablename__, owner_id)
+    return [row.id for row in rows]
+
+
+def bulk_update(
+    *, session: Session, model: Any, criteria: list[Any], values: dict[str, Any]
+) -> list[uuid.UUID]:
+    """
+    Sets values on the rows of model matching criteria with a single UPDATE and
+    returns their ids.
+    """
+    rows = session.execute(bulk_update_statement(model, criteria, values)).all()
+    counts = bulk_counts_statement(model, rows, 0) if values else None
+    if counts is not None:
+        session.execute(counts)
+    session.commit()
+    return publish_bulk_write(model, rows)
+
+
+def bulk_delete(
+    *, session: Session, model: Any, criteria: list[Any]
+) -> list[uuid.UUID]:
+    """
+    Deletes the rows of model matching criteria with a single DELETE and
+    returns their ids.
+    """
+    rows = session.execute(bulk_delete_statement(model, criteria)).all()
+    counts = bulk_counts_statement(model, rows, -1)
+    if counts is not None:
+        session.execute(counts)
+    session.commit()
+    return publish_bulk_write(model, rows)
+
+
+def owned_row_criteria(
+    model: Any, id: uuid.UUID, owner_id: uuid.UUID | None
+) -> list[Any]:
+    """The row of model with id, if owned by owner_id (or anyone when None)."""
+    criteria = [model.id == id]
+    if owner_id is not None:
+        criteria.append(model.owner_id == owner_id)
+    return criteria
+
+
+def owned_update_statement(
+    model: Any, id: uuid.UUID, owner_id: uuid.UUID | None, values: dict[str, Any]
+) -> Any:
+    criteria = owned_row_criteria(model, id, owner_id)
+    if not values:
+        return select(model).where(*criteria)
+    return (
+        update(model)
+        .where(*criteria)
+        .values(values)
+        .returning(model)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+def update_owned(
+    *,
+    session: Session,
+    model: Any,
+    id: uuid.UUID,
+    owner_id: uuid.UUID | None,
+    values: dict[str, Any],
+) -> Any | None:
+    """
+    Sets values on the row of model with id owned by owner_id in a single
+    UPDATE ... RETURNING and returns it, or None when no such row exists.
+    """
+    row = session.scalars(owned_update_statement(model, id, owner_id, values)).first()
+    if row is None or not values:
+        return row
+    counts = bulk_counts_statement(model, [row], 0)
+    if counts is not None:
+        session.execute(counts)
+    session.commit()
+    publish_bulk_write(model, [row])
+    return row
+
+
+def delete_owned(
+    *, session: Session, model: Any, id: uuid.UUID, owner_id: uuid.UUID | None
+) -> bool:
+    """
+    Deletes the row of model with id owned by owner_id in a single DELETE,
+    False when no such row exists.
+    """
+    criteria = owned_row_criteria(model, id, owner_id)
+    return bool(bulk_delete(session=session, model=model, criteria=criteria))
+
+
+def row_exists(*, session: Session, model: Any, id: uuid.UUID) -> bool:
+    return session.exec(select(model.id).where(model.id == id)).first() is not None
+
+
 def get_plant(*, session: Session, plant_id: uuid.UUID) -> Plant | None:
     return session.get(Plant, plant_id)
 
 
-def get_plants(*, session: Session, skip: int = 0, limit: int = 100) -> list[Plant]:
-    statement = select(Plant).offset(skip).limit(limit)
-    return session.exec(statement).all()
+def get_plants(
+    *, session: Session, skip: int = 0, limit: int = 100, cursor: str | None = None
+) -> tuple[list[Plant], str | None]:
+    statement = paginate(select(Plant), Plant.id, cursor=cursor, skip=skip, limit=limit)
+    return split_page(session.exec(statement).all(), limit)
+
+
+def export_plants_statement(owner_id: uuid.UUID | None) -> SelectOfScalar[Plant]:
+    statement = select(Plant).order_by(Plant.id)
+    if owner_id is not None:
+        statement = statement.where(Plant.owner_id == owner_id)
+    return statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+
+
+def iter_plants(
+    *, session: Session, owner_id: uuid.UUID | None = None
+) -> Iterator[Sequence[Plant]]:
+    """
+    Plants of owner_id, or all of them when owner_id is None, in batches of
+    EXPORT_BATCH_SIZE read through a server-side cursor.
+    """
+    yield from session.exec(export_plants_statement(owner_id)).partitions()
+
+
+# Fields matched by plant searches, each with a trigram index
+PLANT_SEARCH_FIELDS = ("name", "cultivar", "location", "notes")
+
+
+def search_plants_statement(
+    q: str, owner_id: uuid.UUID | None
+) -> SelectOfScalar[Plant]:
+    """
+    Plants with a search field containing words similar to q, typos included
+    (pg_trgm's <% with its word_similarity_threshold), best matches first.
+    """
+    columns = [getattr(Plant, name) for name in PLANT_SEARCH_FIELDS]
+    rank = func.greatest(*(func.word_similarity(q, column) for column in columns))
+    statement = select(Plant).where(
+        or_(*(literal(q).op("<%", is_comparison=True)(column) for column in columns))
+    )
+    if owner_id is not None:
+        statement = statement.where(Plant.owner_id == owner_id)
+    return statement.order_by(rank.desc(), Plant.id)
+
+
+def search_plants(
+    *,
+    session: Session,
+    q: str,
+    owner_id: uuid.UUID | None,
+    skip: int = 0,
+    limit: int = 20,
+    fields: Sequence[str] | None = None,
+) -> list[Plant]:
+    statement = search_plants_statement(q, owner_id).offset(skip).limit(limit)
+    if fields is not None:
+        statement = statement.options(load_only(*(getattr(Plant, f) for f in fields)))
+    return list(session.exec(statement).all())
+
+
+def plant_names_statement(
+    prefix: str, owner_id: uuid.UUID | None, limit: int
+) -> SelectOfScalar[str]:
+    """
+    Distinct plant names starting with prefix, ignoring case. ILIKE rather
+    than lower() so that the name trigram index serves it.
+    """
+    pattern = prefix.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    statement = select(Plant.name).where(Plant.name.ilike(f"{pattern}%", escape="/"))
+    if owner_id is not None:
+        statement = statement.where(Plant.owner_id == owner_id)
+    return statement.distinct().order_by(Plant.name).limit(limit)
+
+
+def get_plant_names(
+    *, session: Session, prefix: str, owner_id: uuid.UUID | None, limit: int = 10
+) -> list[str]:
+    return list(session.exec(plant_names_statement(prefix, owner_id, limit)).all())
 
 
 def update_plant(*, session: Session, db_plant: Plant, plant_in: PlantUpdate) -> Plant:
@@ -94,15 +681,21 @@ def create_reminder(*, session: Session, reminder_in: ReminderCreate) -> Reminde
     db_reminder = Reminder.model_validate(reminder_in)
     session.add(db_reminder)
     session.commit()
-    session.refresh(db_reminder)
     return db_reminder
 
+def due_reminders_statement(now: datetime) -> SelectOfScalar[Reminder]:
+    return select(Reminder).where(Reminder.remind_time <= now)
+
 def get_reminder(*, session: Session, reminder_id: uuid.UUID) -> Reminder | None:
     return session.get(Reminder, reminder_id)
 
-def get_reminders(*, session: Session, skip: int = 0, limit: int = 100) -> list[Reminder]:
-    statement = select(Reminder).offset(skip).limit(limit)
-    return session.exec(statement).all()
+def get_reminders(
+    *, session: Session, skip: int = 0, limit: int = 100, cursor: str | None = None
+) -> tuple[list[Reminder], str | None]:
+    statement = paginate(
+        select(Reminder), Reminder.id, cursor=cursor, skip=skip, limit=limit
+    )
+    return split_page(session.exec(statement).all(), limit)
 
 def update_reminder(*, session: Session, db_reminder: Reminder, reminder_in: ReminderUpdate) -> Reminder:
     reminder_data = reminder_in.model_dump(exclude_unset=True)
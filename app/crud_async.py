@@ -0,0 +1,304 @@
+import asyncio
+import itertools
+import uuid
+from collections.abc import AsyncIterator, Iterable, Sequence
+from typing import Any, TypeVar
+
+from sqlalchemy import insert
+from sqlalchemy.orm import load_only
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import crud
+from app.core.config import settings
+from app.core.etag import make_etag
+from app.core.pagination import split_page
+from app.core.security import get_password_hash_async, verify_password_async
+from app.counters import (
+    adjust_counts_statement,
+    list_version_statement,
+    publish_write,
+)
+from app.models import (
+    Item,
+    ItemCreate,
+    Plant,
+    PlantCreate,
+    User,
+    UserCreate,
+    UserUpdate,
+)
+
+# AsyncSession counterparts of app.crud, used by the async route handlers.
+# They share the user cache and invalidation events of app.crud.
+
+T = TypeVar("T")
+
+# Rows of an import read from the upload per trip to a worker thread
+IMPORT_READ_BATCH_SIZE = 500
+
+
+async def batches_in_thread(rows: Iterable[T], size: int) -> AsyncIterator[list[T]]:
+    """
+    Batches of rows, consumed in a worker thread so blocking reads (e.g. of an
+    upload spooled to disk) and the parsing behind rows stay off the event loop.
+    """
+    iterator = iter(rows)
+    while batch := await asyncio.to_thread(list, itertools.islice(iterator, size)):
+        yield batch
+
+
+async def get_user(*, session: AsyncSession, user_id: uuid.UUID | str) -> User | None:
+    data = crud.user_cache.get(str(user_id))
+    if data is not None:
+        return crud.user_from_cache(session.sync_session, data)
+    return await load_user(session=session, user_id=user_id)
+
+
+async def load_user(*, session: AsyncSession, user_id: uuid.UUID | str) -> User | None:
+    user = await session.get(User, user_id)
+    if user:
+        crud.cache_user(user)
+    return user
+
+
+async def get_user_by_email(*, session: AsyncSession, email: str) -> User | None:
+    user_id = crud.user_id_by_email_cache.get(email)
+    if user_id is not None:
+        data = crud.user_cache.get(user_id)
+        if data is not None and data["email"] == email:
+            return crud.user_from_cache(session.sync_session, data)
+    return await load_user_by_email(session=session, email=email)
+
+
+async def load_user_by_email(*, session: AsyncSession, email: str) -> User | None:
+    statement = select(User).where(User.email == email)
+    session_user = (await session.exec(statement)).first()
+    if session_user:
+        crud.cache_user(session_user)
+    return session_user
+
+
+async def create_user(*, session: AsyncSession, user_create: UserCreate) -> User:
+    db_obj = User.model_validate(
+        user_create,
+        update={"hashed_password": await get_password_hash_async(user_create.password)},
+    )
+    session.add(db_obj)
+    await session.commit()
+    return db_obj
+
+
+async def update_user(
+    *, session: AsyncSession, db_user: User, user_in: UserUpdate
+) -> Any:
+    user_data = user_in.model_dump(exclude_unset=True)
+    extra_data = {}
+    if "password" in user_data:
+        extra_data["hashed_password"] = await get_password_hash_async(
+            user_data["password"]
+        )
+    db_user.sqlmodel_update(user_data, update=extra_data)
+    session.add(db_user)
+    await session.commit()
+    await session.refresh(db_user)
+    crud.invalidate_user(db_user.id)
+    return db_user
+
+
+async def authenticate(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    db_user = await load_user_by_email(session=session, email=email)
+    if not db_user:
+        return None
+    if not await verify_password_async(password, db_user.hashed_password):
+        return None
+    return db_user
+
+
+async def get_page(
+    *,
+    session: AsyncSession,
+    model: Any,
+    owner_id: uuid.UUID | None = None,
+    cursor: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    include_count: bool = True,
+    fields: Sequence[str] | None = None,
+    criteria: Sequence[Any] = (),
+    sort: str = "id",
+) -> tuple[list[Any], int | None, str | None]:
+    statement, count_statement, sort_attribute = crud.page_statements(
+        model=model,
+        owner_id=owner_id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+        include_count=include_count,
+        fields=fields,
+        criteria=criteria,
+        sort=sort,
+    )
+    if count_statement is not None and settings.LIST_COUNT_MODE == "window":
+        rows = (await session.exec(statement)).all()
+        page, next_cursor = split_page([row[0] for row in rows], limit, sort_attribute)
+        if rows:
+            return page, rows[0][1], next_cursor
+        return page, (await session.exec(count_statement)).one(), next_cursor
+    rows = (await session.exec(statement)).all()
+    page, next_cursor = split_page(rows, limit, sort_attribute)
+    count = None
+    if count_statement is not None:
+        count = (await session.exec(count_statement)).one()
+    return page, count, next_cursor
+
+
+async def list_etag(
+    *, session: AsyncSession, model: Any, owner_id: uuid.UUID | None, variant: str
+) -> str | None:
+    if owner_id is None:
+        return None
+    version = (await session.exec(list_version_statement(model, owner_id))).first()
+    return make_etag(model.__tablename__, owner_id, version or 0, variant, weak=True)
+
+
+async def create_item(
+    *, session: AsyncSession, item_in: ItemCreate, owner_id: uuid.UUID
+) -> Item:
+    db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
+    session.add(db_item)
+    await session.commit()
+    return db_item
+
+
+async def create_plant(
+    *, session: AsyncSession, plant_in: PlantCreate, owner_id: uuid.UUID
+) -> Plant:
+    db_plant = Plant.model_validate(plant_in, update={"owner_id": owner_id})
+    session.add(db_plant)
+    await session.commit()
+    return db_plant
+
+
+async def create_plants(
+    *, session: AsyncSession, plants_in: list[PlantCreate], owner_id: uuid.UUID
+) -> list[uuid.UUID]:
+    rows = crud.plant_rows(plants_in, owner_id)
+    if rows:
+        await session.execute(insert(Plant), rows)
+        counts = adjust_counts_statement("plant", {owner_id: len(rows)})
+        if counts is not None:
+            await session.execute(counts)
+        await session.commit()
+        publish_write("plant", owner_id)
+    return [row["id"] for row in rows]
+
+
+async def import_plants(
+    *, session: AsyncSession, plants_in: Iterable[PlantCreate], owner_id: uuid.UUID
+) -> int:
+    staging = crud.plant_staging_table()
+    connection = await session.connection()
+    await connection.run_sync(staging.create)
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+    async with driver_connection.cursor() as cursor:  # type: ignore[union-attr]
+        async with cursor.copy(crud.copy_statement(staging)) as copy:
+            async for plants in batches_in_thread(plants_in, IMPORT_READ_BATCH_SIZE):
+                for row in crud.plant_copy_rows(plants, owner_id, staging):
+                    await copy.write_row(row)
+    count = (await session.execute(crud.merge_staging_statement(staging))).rowcount
+    counts = adjust_counts_statement("plant", {owner_id: count})
+    if counts is not None:
+        await session.execute(counts)
+    await session.commit()
+    if count:
+        publish_write("plant", owner_id)
+    return count
+
+
+async def bulk_update(
+    *, session: AsyncSession, model: Any, criteria: list[Any], values: dict[str, Any]
+) -> list[uuid.UUID]:
+    statement = crud.bulk_update_statement(model, criteria, values)
+    rows = (await session.execute(statement)).all()
+    counts = crud.bulk_counts_statement(model, rows, 0) if values else None
+    if counts is not None:
+        await session.execute(counts)
+    await session.commit()
+    return crud.publish_bulk_write(model, rows)
+
+
+async def bulk_delete(
+    *, session: AsyncSession, model: Any, criteria: list[Any]
+) -> list[uuid.UUID]:
+    rows = (await session.execute(crud.bulk_delete_statement(model, criteria))).all()
+    counts = crud.bulk_counts_statement(model, rows, -1)
+    if counts is not None:
+        await session.execute(counts)
+    await session.commit()
+    return crud.publish_bulk_write(model, rows)
+
+
+async def update_owned(
+    *,
+    session: AsyncSession,
+    model: Any,
+    id: uuid.UUID,
+    owner_id: uuid.UUID | None,
+    values: dict[str, Any],
+) -> Any | None:
+    statement = crud.owned_update_statement(model, id, owner_id, values)
+    row = (await session.scalars(statement)).first()
+    if row is None or not values:
+        return row
+    counts = crud.bulk_counts_statement(model, [row], 0)
+    if counts is not None:
+        await session.execute(counts)
+    await session.commit()
+    crud.publish_bulk_write(model, [row])
+    return row
+
+
+async def delete_owned(
+    *, session: AsyncSession, model: Any, id: uuid.UUID, owner_id: uuid.UUID | None
+) -> bool:
+    criteria = crud.owned_row_criteria(model, id, owner_id)
+    return bool(await bulk_delete(session=session, model=model, criteria=criteria))
+
+
+async def row_exists(*, session: AsyncSession, model: Any, id: uuid.UUID) -> bool:
+    statement = select(model.id).where(model.id == id)
+    return (await session.exec(statement)).first() is not None
+
+
+async def iter_plants(
+    *, session: AsyncSession, owner_id: uuid.UUID | None = None
+) -> AsyncIterator[Sequence[Plant]]:
+    result = await session.stream_scalars(crud.export_plants_statement(owner_id))
+    async for plants in result.partitions():
+        yield plants
+
+
+async def search_plants(
+    *,
+    session: AsyncSession,
+    q: str,
+    owner_id: uuid.UUID | None,
+    skip: int = 0,
+    limit: int = 20,
+    fields: Sequence[str] | None = None,
+) -> list[Plant]:
+    statement = crud.search_plants_statement(q, owner_id).offset(skip).limit(limit)
+    if fields is not None:
+        statement = statement.options(load_only(*(getattr(Plant, f) for f in fields)))
+    return list((await session.exec(statement)).all())
+
+
+async def get_plant_names(
+    *, session: AsyncSession, prefix: str, owner_id: uuid.UUID | None, limit: int = 10
+) -> list[str]:
+    statement = crud.plant_names_statement(prefix, owner_id, limit)
+    return list((await session.exec(statement)).all())
@@ -0,0 +1,44 @@
+import csv
+import io
+from collections.abc import AsyncIterable, Iterable, Sequence
+from typing import Literal
+
+from fastapi.responses import StreamingResponse
+from sqlmodel import SQLModel
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def csv_header(model: type[SQLModel]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(model.model_fields)
+    return buffer.getvalue()
+
+
+def format_rows(
+    rows: Sequence[SQLModel], model: type[SQLModel], format: ExportFormat
+) -> str:
+    """One chunk of an export: rows serialized as model, one line each."""
+    if format == "ndjson":
+        return "".join(
+            model.model_validate(row).model_dump_json() + "\n" for row in rows
+        )
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(model.model_fields))
+    writer.writerows(model.model_validate(row).model_dump(mode="json") for row in rows)
+    return buffer.getvalue()
+
+
+def export_response(
+    chunks: Iterable[str] | AsyncIterable[str], format: ExportFormat, name: str
+) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'},
+    )
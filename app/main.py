@@ -1,11 +1,17 @@
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from app.scheduler import start_scheduler
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
 from app.core.config import settings
+from app.core.invalidation import bus
+from app.core.pagination import InvalidCursorError
+from app.core.responses import FastJSONResponse
+from app.core.security import PasswordHasherBusyError
+from app.middleware import CompressionMiddleware, QueryStatsMiddleware
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -19,8 +25,21 @@ app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    default_response_class=(
+        FastJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse
+    ),
 )
 
+app.add_middleware(QueryStatsMiddleware)
+
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_COMPRESS_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+
 # Set all CORS enabled origins
 if settings.all_cors_origins:
     app.add_middleware(
@@ -34,7 +53,31 @@ if settings.all_cors_origins:
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(
+    _request: Request, _exc: PasswordHasherBusyError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many authentication requests, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(
+    _request: Request, _exc: InvalidCursorError
+) -> JSONResponse:
+    return JSONResponse(status_code=400, content={"detail": "Invalid cursor"})
+
+
 # Start the scheduler when the app starts
 @app.on_event("startup")
 def startup_event():
-    start_scheduler()
\ No newline at end of file
+    start_scheduler()
+    bus.start()
+
+
+@app.on_event("shutdown")
+def shutdown_event() -> None:
+    bus.stop()
\ No newline at end of file
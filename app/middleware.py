@@ -0,0 +1,173 @@
+import logging
+import time
+from typing import Any
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.db import QueryStats, current_query_stats
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, responses are gzipped without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceededError(Exception):
+    pass
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the SQL statements and database time of each request, reports them
+    in a Server-Timing header and a log line, and enforces SQL_QUERY_BUDGET.
+
+    The header is sent with the response start, so statements run while a
+    streaming body is produced only appear in the log line.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            logger.info(
+                "method=%s path=%s status=%s queries=%d db_ms=%.2f total_ms=%.2f",
+                scope["method"],
+                scope["path"],
+                status_code,
+                stats.count,
+                stats.duration * 1000,
+                (time.perf_counter() - start) * 1000,
+            )
+
+        budget = settings.SQL_QUERY_BUDGET
+        if budget is not None and stats.count > budget:
+            message = (
+                f"{scope['method']} {scope['path']} ran {stats.count} SQL "
+                f"statements, over the budget of {budget}"
+            )
+            if settings.SQL_QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceededError(message)
+            logger.warning(message)
+
+
+class StreamingGZipResponder(GZipResponder):
+    """GZipResponder that flushes every chunk of a streaming body."""
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if not more_body:
+            return super().apply_compression(body, more_body=False)
+        self.gzip_file.write(body)
+        self.gzip_file.flush()
+        body = self.gzip_buffer.getvalue()
+        self.gzip_buffer.seek(0)
+        self.gzip_buffer.truncate()
+        return body
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor: Any = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if more_body:
+            return self.compressor.process(body) + self.compressor.flush()
+        return self.compressor.process(body) + self.compressor.finish()
+
+
+def accepted_encodings(headers: Headers) -> set[str]:
+    """Content codings listed in Accept-Encoding, except those with q=0."""
+    encodings = set()
+    for value in headers.get("Accept-Encoding", "").split(","):
+        coding, *params = (part.strip() for part in value.split(";"))
+        q = next((p[2:] for p in params if p.lower().startswith("q=")), "1")
+        try:
+            accepted = float(q) > 0
+        except ValueError:
+            accepted = False
+        if coding and accepted:
+            encodings.add(coding.lower())
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    Compresses response bodies of at least minimum_size bytes with Brotli (when
+    the brotli package is installed) or gzip, as accepted by the client.
+    Streaming bodies are compressed chunk by chunk, each flushed as it is sent.
+
+    Strong ETags of compressed responses are sent weak, as the compressed
+    bytes are not those the ETag was computed from.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1_000,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encodings = accepted_encodings(Headers(scope=scope))
+        responder: ASGIApp
+        if brotli is not None and "br" in encodings:
+            responder = BrotliResponder(
+                self.app, self.minimum_size, quality=self.brotli_quality
+            )
+        elif "gzip" in encodings:
+            responder = StreamingGZipResponder(
+                self.app, self.minimum_size, compresslevel=self.gzip_level
+            )
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_weak_etag(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                etag = headers.get("ETag")
+                if etag and "Content-Encoding" in headers and etag[:2] != "W/":
+                    headers["ETag"] = f"W/{etag}"
+            await send(message)
+
+        await responder(scope, receive, send_with_weak_etag)
@@ -1,8 +1,11 @@
+import datetime as dt
 import uuid
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import date, datetime
-from pydantic import EmailStr
-from sqlmodel import Field, Relationship, SQLModel
+from pydantic import EmailStr, model_validator
+from sqlalchemy import DateTime
+from typing_extensions import Self
+from sqlmodel import Field, Index, Relationship, SQLModel
 
 
 # Shared properties
@@ -54,7 +57,8 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
 
 
 # Shared properties
@@ -72,9 +76,19 @@ class ItemCreate(ItemBase):
 class ItemUpdate(ItemBase):
     title: str | None = Field(default=None, min_length=1, max_length=255)  # type: ignore
 
+    @model_validator(mode="after")
+    def _check_required_fields(self) -> Self:
+        # It may be left out, but its column is NOT NULL
+        if "title" in self.model_fields_set and self.title is None:
+            raise ValueError("title cannot be null")
+        return self
+
 
 # Database model, database table inferred from class name
 class Item(ItemBase, table=True):
+    # Owner listings filter by owner_id and page by id
+    __table_args__ = (Index("ix_item_owner_id_id", "owner_id", "id"),)
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     title: str = Field(max_length=255)
     owner_id: uuid.UUID = Field(
@@ -89,8 +103,48 @@ class ItemPublic(ItemBase):
     owner_id: uuid.UUID
 
 
+class ItemsSelection(SQLModel):
+    ids: list[uuid.UUID]
+
+
+class ItemsBulkUpdate(ItemsSelection):
+    update: ItemUpdate
+
+
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
+    count: int | None
+    next_cursor: str | None = None
+
+
+# Number of rows of a table owned by each user, kept up to date on every
+# flush by app.counters so listings do not have to count the rows
+class OwnerCount(SQLModel, table=True):
+    owner_id: uuid.UUID = Field(
+        foreign_key="user.id", primary_key=True, ondelete="CASCADE"
+    )
+    table_name: str = Field(primary_key=True, max_length=64)
+    count: int = 0
+    # Bumped by every write to the owner's rows of the table, for list ETags
+    version: int = 0
+
+
+# Last time the token claims of a user (see create_access_token) changed or the
+# user was deleted, recorded on every flush by app.core.db. Claims of tokens
+# issued before then are not trusted without a lookup. No foreign key, the row
+# outlives a deleted user.
+class UserChange(SQLModel, table=True):
+    user_id: uuid.UUID = Field(primary_key=True)
+    changed_at: datetime = Field(sa_type=DateTime(timezone=True), index=True)
+
+
+# Ids of the rows created, updated or deleted by a bulk request
+class BulkResult(SQLModel):
+    ids: list[uuid.UUID]
+
+
+# Number of rows created by an import
+class ImportResult(SQLModel):
     count: int
 
 
@@ -108,6 +162,11 @@ class Token(SQLModel):
 # Contents of JWT token
 class TokenPayload(SQLModel):
     sub: str | None = None
+    iat: int | None = None
+    email: str | None = None
+    full_name: str | None = None
+    is_superuser: bool | None = None
+    is_active: bool | None = None
 
 
 class NewPassword(SQLModel):
@@ -137,10 +196,40 @@ class PlantCreate(PlantBase):
 # Properties to receive on plant update
 class PlantUpdate(PlantBase):
     name: Optional[str] = None
+    quantity: Optional[int] = None
+    date: Optional[dt.date] = None
     life_cycle: Optional[str] = None
 
+    @model_validator(mode="after")
+    def _check_required_fields(self) -> Self:
+        # They may be left out, but their columns are NOT NULL
+        for name in ("name", "quantity", "date"):
+            if name in self.model_fields_set and getattr(self, name) is None:
+                raise ValueError(f"{name} cannot be null")
+        return self
+
 # Database model, database table inferred from class name
 class Plant(PlantBase, table=True):
+    __table_args__ = (
+        # Owner listings filter by owner_id and page by id, or sort by date,
+        # name or quantity or filter by location then page by id
+        Index("ix_plant_owner_id_id", "owner_id", "id"),
+        Index("ix_plant_owner_id_date_id", "owner_id", "date", "id"),
+        Index("ix_plant_owner_id_name_id", "owner_id", "name", "id"),
+        Index("ix_plant_owner_id_quantity_id", "owner_id", "quantity", "id"),
+        Index("ix_plant_owner_id_location_id", "owner_id", "location", "id"),
+        # Trigram (pg_trgm) indexes of the fields matched by /plants/search
+        *(
+            Index(
+                f"ix_plant_{name}_trgm",
+                name,
+                postgresql_using="gin",
+                postgresql_ops={name: "gin_trgm_ops"},
+            )
+            for name in ("name", "cultivar", "location", "notes")
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     owner_id: Optional[uuid.UUID] = Field(default=None, foreign_key="user.id")
 
@@ -148,9 +237,64 @@ class Plant(PlantBase, table=True):
 class PlantPublic(PlantBase):
     id: uuid.UUID
 
+# Plant with only the fields picked by ?fields=, the others are left out of
+# the response
+class PlantFieldsPublic(PlantBase):
+    id: uuid.UUID
+    name: Optional[str] = None
+    quantity: Optional[int] = None
+    date: Optional[dt.date] = None
+
+# Plants targeted by a bulk update or delete: those with the given ids and
+# matching every filter that is set
+class PlantsSelection(SQLModel):
+    ids: list[uuid.UUID] | None = None
+    location: str | None = None
+    life_cycle: str | None = None
+    planted_before: dt.date | None = None
+
+    @model_validator(mode="after")
+    def _check_selection(self) -> Self:
+        if all(getattr(self, name) is None for name in PlantsSelection.model_fields):
+            raise ValueError("Select plants by ids or at least one filter")
+        return self
+
+
+class PlantsBulkUpdate(PlantsSelection):
+    update: PlantUpdate
+
+
+# Filters of plant listings, the plants match every one that is set. Dates
+# are inclusive; maturity_before is compared with date + days_to_maturity.
+class PlantFilters(SQLModel):
+    location: str | None = None
+    life_cycle: str | None = None
+    cultivar: str | None = None
+    date_from: dt.date | None = None
+    date_to: dt.date | None = None
+    maturity_before: dt.date | None = None
+
+
+# Orders of plant listings, by a required field then id, "-" for descending
+PlantSort = Literal["id", "date", "-date", "name", "-name", "quantity", "-quantity"]
+
+
 class PlantsPublic(SQLModel):
     data: List[PlantPublic]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
+
+
+# PlantsPublic with only the fields picked by ?fields=
+class PlantsFieldsPublic(SQLModel):
+    data: List[PlantFieldsPublic]
+    count: int | None
+    next_cursor: str | None = None
+
+
+# Distinct plant names, for autocompletion
+class PlantNames(SQLModel):
+    data: list[str]
 
 
 class ReminderBase(SQLModel):
@@ -167,6 +311,9 @@ class ReminderUpdate(ReminderBase):
 
 class Reminder(ReminderBase, table=True):
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
+    plant_id: uuid.UUID = Field(index=True)
+    # Range-scanned by the due reminders job every minute
+    remind_time: datetime = Field(index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -177,4 +324,5 @@ class ReminderPublic(ReminderBase):
 
 class RemindersPublic(SQLModel):
     data: list[ReminderPublic]
-    count: int
\ No newline at end of file
+    count: int
+    next_cursor: str | None = None
\ No newline at end of file
@@ -1,11 +1,12 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from sqlmodel import Session, select
+from sqlmodel import Session
 from datetime import datetime, timezone
 import logging
 
-from app.core.db import engine
-from app.models import Reminder
+from app.core.db import engine, pool_status
+from app.counters import reconcile_counts
+from app import crud
 from app.core.config import settings
 
 logging.basicConfig(level=settings.LOGGING_LEVEL)
@@ -17,9 +18,7 @@ def check_due_reminders():
     """
     with Session(engine) as session:
         now = datetime.now(timezone.utc)
-        due_reminders = session.exec(
-            select(Reminder).where(Reminder.remind_time <= now)
-        ).all()
+        due_reminders = session.exec(crud.due_reminders_statement(now)).all()
 
         if not due_reminders:
             logger.info("No reminders due.")
@@ -30,6 +29,23 @@ def check_due_reminders():
             )
 
 
+def log_db_pool_status():
+    """
+    Task to log connection pool usage of this worker.
+    """
+    logger.info("DB pool status: %s", pool_status())
+
+
+def reconcile_owner_counts():
+    """
+    Task to fix the per-owner list counters that drifted from the tables.
+    """
+    with Session(engine) as session:
+        changed = reconcile_counts(session)
+    if changed:
+        logger.warning("Reconciled %d owner count rows", changed)
+
+
 def start_scheduler():
     """
     Start the APScheduler to run periodic tasks.
@@ -41,5 +57,19 @@ def start_scheduler():
         id="check_due_reminders",
         replace_existing=True,
     )
+    if settings.DB_POOL_LOG_INTERVAL_SECONDS > 0:
+        scheduler.add_job(
+            log_db_pool_status,
+            trigger=IntervalTrigger(seconds=settings.DB_POOL_LOG_INTERVAL_SECONDS),
+            id="log_db_pool_status",
+            replace_existing=True,
+        )
+    if settings.COUNTS_RECONCILE_INTERVAL_SECONDS > 0:
+        scheduler.add_job(
+            reconcile_owner_counts,
+            trigger=IntervalTrigger(seconds=settings.COUNTS_RECONCILE_INTERVAL_SECONDS),
+            id="reconcile_owner_counts",
+            replace_existing=True,
+        )
     scheduler.start()
     logger.info("Scheduler started!")
\ No newline at end of file
@@ -0,0 +1,91 @@
+from collections.abc import Generator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.main import with_async_handlers
+from app.api.routes import items, items_async, plants, plants_async
+from app.core.config import settings
+from app.tests.utils.plants import create_random_plant
+
+
+@pytest.fixture(scope="module")
+def async_client() -> Generator[TestClient, None, None]:
+    app = FastAPI()
+    app.include_router(
+        with_async_handlers(plants.router, plants_async.router),
+        prefix=settings.API_V1_STR,
+    )
+    app.include_router(
+        with_async_handlers(items.router, items_async.router),
+        prefix=settings.API_V1_STR,
+    )
+    with TestClient(app) as c:
+        yield c
+
+
+def test_with_async_handlers_keeps_route_order() -> None:
+    merged = with_async_handlers(plants.router, plants_async.router)
+    assert [r.path for r in merged.routes] == [r.path for r in plants.router.routes]
+    assert {r.endpoint.__module__ for r in merged.routes} == {  # type: ignore[attr-defined]
+        plants_async.__name__
+    }
+
+
+def test_async_plant_crud(
+    async_client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    data = {"name": "Squash", "quantity": 2, "date": "2025-05-01"}
+    r = async_client.post(
+        f"{settings.API_V1_STR}/plants/", headers=superuser_token_headers, json=data
+    )
+    assert r.status_code == 200
+    plant_id = r.json()["id"]
+    r = async_client.put(
+        f"{settings.API_V1_STR}/plants/{plant_id}",
+        headers=superuser_token_headers,
+        json={**data, "name": "Zucchini"},
+    )
+    assert r.status_code == 200
+    assert r.json()["name"] == "Zucchini"
+    r = async_client.get(
+        f"{settings.API_V1_STR}/plants/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    assert plant_id in {p["id"] for p in r.json()["data"]}
+    r = async_client.delete(
+        f"{settings.API_V1_STR}/plants/{plant_id}", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    r = async_client.get(
+        f"{settings.API_V1_STR}/plants/{plant_id}", headers=superuser_token_headers
+    )
+    assert r.status_code == 404
+
+
+def test_async_read_plant_not_enough_permissions(
+    async_client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    plant = create_random_plant(db)
+    r = async_client.get(
+        f"{settings.API_V1_STR}/plants/{plant.id}", headers=normal_user_token_headers
+    )
+    assert r.status_code == 400
+
+
+def test_async_items(
+    async_client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = async_client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"title": "Trowel"},
+    )
+    assert r.status_code == 200
+    r = async_client.get(
+        f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 200
+    assert r.json()["count"] >= 1
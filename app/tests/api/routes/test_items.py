@@ -5,6 +5,7 @@ from sqlmodel import Session
 
 from app.core.config import settings
 from app.tests.utils.item import create_random_item
+from app.tests.utils.utils import query_count
 
 
 def test_create_item(
@@ -24,6 +25,20 @@ def test_create_item(
     assert "owner_id" in content
 
 
+def test_create_item_is_not_read_back(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"title": "Foo"},
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "Foo"
+    # Current user, INSERT and counter upsert
+    assert query_count(response) == 3
+
+
 def test_read_item(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -79,6 +94,72 @@ def test_read_items(
     assert len(content["data"]) >= 2
 
 
+def test_read_items_by_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(3):
+        create_random_item(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"limit": 1000},
+    )
+    expected = [item["id"] for item in response.json()["data"]]
+    assert expected == sorted(expected, key=uuid.UUID)
+
+    ids: list[str] = []
+    params: dict[str, str | int] = {"limit": 2}
+    while True:
+        response = client.get(
+            f"{settings.API_V1_STR}/items/",
+            headers=superuser_token_headers,
+            params=params,
+        )
+        assert response.status_code == 200
+        content = response.json()
+        ids += [item["id"] for item in content["data"]]
+        if content["next_cursor"] is None:
+            break
+        params["cursor"] = content["next_cursor"]
+    assert ids == expected
+
+
+def test_read_items_invalid_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"cursor": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_read_items_not_modified(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    response = client.post(
+        url, headers=normal_user_token_headers, json={"title": "Poll"}
+    )
+    item_id = response.json()["id"]
+    etag = client.get(url, headers=normal_user_token_headers).headers["etag"]
+    response = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    client.put(
+        f"{settings.API_V1_STR}/items/{item_id}",
+        headers=normal_user_token_headers,
+        json={"title": "Polled"},
+    )
+    response = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
 def test_update_item(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -97,6 +178,24 @@ def test_update_item(
     assert content["owner_id"] == str(item.owner_id)
 
 
+def test_update_item_rejects_null_title(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    response = client.put(
+        f"{settings.API_V1_STR}/items/{item.id}",
+        headers=superuser_token_headers,
+        json={"title": None},
+    )
+    assert response.status_code == 422
+    response = client.patch(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=superuser_token_headers,
+        json={"ids": [str(item.id)], "update": {"title": None}},
+    )
+    assert response.status_code == 422
+
+
 def test_update_item_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -162,3 +261,64 @@ def test_delete_item_not_enough_permissions(
     assert response.status_code == 400
     content = response.json()
     assert content["detail"] == "Not enough permissions"
+
+
+def test_update_and_delete_item_statements(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    item = client.post(url, headers=normal_user_token_headers, json={"title": "Foo"})
+    url += item.json()["id"]
+    response = client.put(url, headers=normal_user_token_headers, json={"title": "Bar"})
+    assert response.json()["title"] == "Bar"
+    # Current user, UPDATE ... RETURNING and counter upsert, the row is not
+    # loaded first
+    assert query_count(response) == 3
+    response = client.delete(url, headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert query_count(response) == 3
+
+
+def test_update_items_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    ids = [
+        client.post(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            json={"title": f"Item {i}"},
+        ).json()["id"]
+        for i in range(3)
+    ]
+    other = create_random_item(db)
+    response = client.patch(
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=normal_user_token_headers,
+        json={"ids": ids + [str(other.id)], "update": {"description": "Bulk"}},
+    )
+    assert response.status_code == 200
+    assert sorted(response.json()["ids"]) == sorted(ids)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/{ids[0]}", headers=normal_user_token_headers
+    )
+    assert response.json()["description"] == "Bulk"
+    assert response.json()["title"] == "Item 0"
+
+
+def test_delete_items_bulk(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    items = [create_random_item(db) for _ in range(2)]
+    response = client.request(
+        "DELETE",
+        f"{settings.API_V1_STR}/items/bulk",
+        headers=superuser_token_headers,
+        json={"ids": [str(item.id) for item in items]},
+    )
+    assert response.status_code == 200
+    assert len(response.json()["ids"]) == 2
+    response = client.get(
+        f"{settings.API_V1_STR}/items/{items[0].id}",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 404
@@ -1,14 +1,20 @@
+import csv
+import io
+import json
 import uuid
 
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
+from app import crud
 from app.core.config import settings
-from app.tests.utils.plant import create_random_plant
+from app.models import Plant, PlantPublic
+from app.tests.utils.plants import create_random_plant
+from app.tests.utils.utils import query_count
 
 
 def test_create_plant(
-    client: TestClient, superuser_token_headers: dict[str, str]
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
     data = {
         "name": "Tomato",
@@ -33,8 +39,312 @@ def test_create_plant(
     assert content["name"] == data["name"]
     assert content["cultivar"] == data["cultivar"]
     assert content["life_cycle"] == data["life_cycle"]
-    assert "id" in content
-    assert "owner_id" in content
+    plant = db.get(Plant, uuid.UUID(content["id"]))
+    superuser = crud.get_user_by_email(session=db, email=settings.FIRST_SUPERUSER)
+    assert plant and superuser
+    assert plant.owner_id == superuser.id
+
+
+def test_create_plant_is_not_read_back(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    data = {"name": "Basil", "quantity": 1, "date": "2025-03-13"}
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    assert response.status_code == 200
+    assert response.json()["name"] == "Basil"
+    # Current user, INSERT and counter upsert
+    assert query_count(response) == 3
+
+
+def test_create_plants_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    data = [
+        {"name": f"Bean {i}", "quantity": i + 1, "date": "2025-03-13"}
+        for i in range(50)
+    ]
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    assert response.status_code == 200
+    ids = response.json()["ids"]
+    assert len(ids) == 50
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/{ids[-1]}", headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["name"] == "Bean 49"
+
+
+def test_create_plants_bulk_ndjson(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    lines = [
+        json.dumps({"name": f"Pea {i}", "quantity": 1, "date": "2025-03-13"})
+        for i in range(3)
+    ]
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers={**normal_user_token_headers, "Content-Type": "application/x-ndjson"},
+        content="\n".join(lines) + "\n",
+    )
+    assert response.status_code == 200
+    assert len(response.json()["ids"]) == 3
+
+
+def test_create_plants_bulk_reports_invalid_rows(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers
+    )
+    count = response.json()["count"]
+    data = [
+        {"name": "Kale", "quantity": 1, "date": "2025-03-13"},
+        {"name": "Kale"},
+        {"name": "Kale", "quantity": "many", "date": "2025-03-13"},
+    ]
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    assert response.status_code == 422
+    errors = response.json()["detail"]
+    assert [error["index"] for error in errors] == [1, 2]
+    assert errors[1]["errors"][0]["loc"] == ["quantity"]
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers
+    )
+    assert response.json()["count"] == count
+
+
+def test_create_plants_bulk_too_many(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    data = [{"name": "Leek", "quantity": 1, "date": "2025-03-13"}] * (
+        settings.BULK_MAX_ITEMS + 1
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    assert response.status_code == 413
+
+
+def test_update_plants_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    location = f"bed-{uuid.uuid4().hex[:8]}"
+    data = [
+        {"name": f"Pea {i}", "quantity": 1, "date": "2025-03-13", "location": location}
+        for i in range(5)
+    ]
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    ids = response.json()["ids"]
+    response = client.patch(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json={"ids": ids[:2], "update": {"notes": "mulched"}},
+    )
+    assert response.status_code == 200
+    assert sorted(response.json()["ids"]) == sorted(ids[:2])
+    response = client.patch(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json={"location": location, "update": {"quantity": 3}},
+    )
+    assert sorted(response.json()["ids"]) == sorted(ids)
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/{ids[0]}", headers=normal_user_token_headers
+    )
+    content = response.json()
+    assert content["notes"] == "mulched"
+    assert content["quantity"] == 3
+    assert content["name"] == "Pea 0"
+
+
+def test_update_plants_bulk_requires_selection(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.patch(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json={"update": {"quantity": 3}},
+    )
+    assert response.status_code == 422
+
+
+def test_delete_plants_bulk(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    superuser_token_headers: dict[str, str],
+) -> None:
+    data = [{"name": "Kale", "quantity": 1, "date": "2025-03-13"}] * 3
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    ids = response.json()["ids"]
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=superuser_token_headers,
+        json=data[:1],
+    )
+    other_ids = response.json()["ids"]
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers
+    )
+    count = response.json()["count"]
+    response = client.request(
+        "DELETE",
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json={"ids": ids[:2] + other_ids},
+    )
+    assert response.status_code == 200
+    assert sorted(response.json()["ids"]) == sorted(ids[:2])
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers
+    )
+    assert response.json()["count"] == count - 2
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/{other_ids[0]}",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+
+
+def test_delete_plants_bulk_too_many(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.request(
+        "DELETE",
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json={"ids": [str(uuid.uuid4()) for _ in range(settings.BULK_MAX_ITEMS + 1)]},
+    )
+    assert response.status_code == 413
+
+
+def test_import_plants(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers
+    )
+    count = response.json()["count"]
+    location = f"row-{uuid.uuid4().hex[:8]}"
+    lines = ["name,quantity,date,location,notes"] + [
+        f'Onion {i},{i + 1},2025-03-13,{location},"sown, then ""thinned"""'
+        for i in range(200)
+    ]
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/import",
+        headers=normal_user_token_headers,
+        files={"file": ("plants.csv", "\n".join(lines), "text/csv")},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"count": 200}
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers
+    )
+    assert response.json()["count"] == count + 200
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/export", headers=normal_user_token_headers
+    )
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    imported = [row for row in rows if row["location"] == location]
+    assert len(imported) == 200
+    assert imported[0]["notes"] == 'sown, then "thinned"'
+    assert imported[0]["cultivar"] is None
+
+
+def test_import_plants_reports_invalid_rows(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers
+    )
+    count = response.json()["count"]
+    data = "name,quantity,date\nLeek,1,2025-03-13\nLeek,many,2025-03-13\n"
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/import",
+        headers=normal_user_token_headers,
+        files={"file": ("plants.csv", data, "text/csv")},
+    )
+    assert response.status_code == 422
+    detail = response.json()["detail"]
+    assert [error["line"] for error in detail] == [3]
+    assert detail[0]["errors"][0]["loc"] == ["quantity"]
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers
+    )
+    assert response.json()["count"] == count
+
+
+def test_export_plants(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    data = [
+        {"name": f"Radish, {i}", "quantity": i + 1, "date": "2025-03-13"}
+        for i in range(3)
+    ]
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    ids = response.json()["ids"]
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers
+    )
+    count = response.json()["count"]
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/export", headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == count
+    exported = {row["id"]: row for row in rows}
+    assert exported[ids[1]]["name"] == "Radish, 1"
+    assert exported[ids[1]]["quantity"] == 2
+
+
+def test_export_plants_csv(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json=[{"name": 'Pepper "hot", red', "quantity": 2, "date": "2025-03-13"}],
+    )
+    plant_id = response.json()["ids"][0]
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/export",
+        headers=normal_user_token_headers,
+        params={"format": "csv"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="plants.csv"' in response.headers["content-disposition"]
+    rows = {row["id"]: row for row in csv.DictReader(io.StringIO(response.text))}
+    assert rows[plant_id]["name"] == 'Pepper "hot", red'
+    assert rows[plant_id]["date"] == "2025-03-13"
+    assert rows[plant_id]["cultivar"] == ""
 
 
 def test_read_plant(
@@ -50,7 +360,8 @@ def test_read_plant(
     assert content["name"] == plant.name
     assert content["cultivar"] == plant.cultivar
     assert content["id"] == str(plant.id)
-    assert content["owner_id"] == str(plant.owner_id)
+    # PlantPublic leaves the owner out
+    assert "owner_id" not in content
 
 
 def test_read_plant_not_found(
@@ -92,6 +403,119 @@ def test_read_plants(
     assert len(content["data"]) >= 2
 
 
+def test_read_plants_fields(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json=[{"name": "Sage", "quantity": 1, "date": "2025-03-13", "notes": "n"}],
+    )
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers
+    )
+    assert response.status_code == 200
+    for plant in response.json()["data"]:
+        assert set(plant) == {"id", *PlantPublic.model_fields}
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/",
+        headers=normal_user_token_headers,
+        params={"fields": "name,date,notes"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] >= 1
+    for plant in content["data"]:
+        assert set(plant) == {"id", "name", "date", "notes"}
+
+
+def test_plant_page_loads_notes_only_when_returned() -> None:
+    statement, _, _ = crud.page_statements(model=Plant)
+    assert "plant.notes" in str(statement)
+    statement, _, _ = crud.page_statements(model=Plant, fields=["name", "date"])
+    assert "plant.notes" not in str(statement)
+
+
+def test_read_plants_unknown_fields(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/",
+        headers=normal_user_token_headers,
+        params={"fields": "name,owner_id"},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Unknown fields: owner_id"
+
+
+def test_read_plant_fields(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json=[{"name": "Dill", "quantity": 1, "date": "2025-03-13", "notes": "n"}],
+    )
+    plant_id = response.json()["ids"][0]
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/{plant_id}", headers=normal_user_token_headers
+    )
+    assert response.json()["notes"] == "n"
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/{plant_id}",
+        headers=normal_user_token_headers,
+        params={"fields": "name"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"id": plant_id, "name": "Dill"}
+
+
+def test_read_plants_not_modified(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/plants/"
+    response = client.get(url, headers=normal_user_token_headers)
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    response = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    client.post(
+        f"{settings.API_V1_STR}/plants/",
+        headers=normal_user_token_headers,
+        json={"name": "Chard", "quantity": 1, "date": "2025-03-13"},
+    )
+    response = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_read_plant_not_modified(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/",
+        headers=normal_user_token_headers,
+        json={"name": "Basil", "quantity": 1, "date": "2025-03-13"},
+    )
+    url = f"{settings.API_V1_STR}/plants/{response.json()['id']}"
+    etag = client.get(url, headers=normal_user_token_headers).headers["etag"]
+    response = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    client.put(url, headers=normal_user_token_headers, json={"quantity": 2})
+    response = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 2
+
+
 def test_update_plant(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -107,7 +531,29 @@ def test_update_plant(
     assert content["name"] == data["name"]
     assert content["cultivar"] == data["cultivar"]
     assert content["id"] == str(plant.id)
-    assert content["owner_id"] == str(plant.owner_id)
+    owner_id = plant.owner_id
+    db.refresh(plant)
+    assert plant.name == data["name"]
+    assert plant.owner_id == owner_id
+
+
+def test_update_plant_rejects_null_required_fields(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    plant = create_random_plant(db)
+    for field in ("name", "quantity", "date"):
+        response = client.put(
+            f"{settings.API_V1_STR}/plants/{plant.id}",
+            headers=superuser_token_headers,
+            json={field: None},
+        )
+        assert response.status_code == 422
+        response = client.patch(
+            f"{settings.API_V1_STR}/plants/bulk",
+            headers=superuser_token_headers,
+            json={"ids": [str(plant.id)], "update": {field: None}},
+        )
+        assert response.status_code == 422
 
 
 def test_update_plant_not_found(
@@ -174,4 +620,142 @@ def test_delete_plant_not_enough_permissions(
     )
     assert response.status_code == 400
     content = response.json()
-    assert content["detail"] == "Not enough permissions"
\ No newline at end of file
+    assert content["detail"] == "Not enough permissions"
+
+
+def test_update_and_delete_plant_statements(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/plants/"
+    data = {"name": "Basil", "quantity": 1, "date": "2025-03-13"}
+    plant = client.post(url, headers=normal_user_token_headers, json=data)
+    url += plant.json()["id"]
+    response = client.put(url, headers=normal_user_token_headers, json={"quantity": 3})
+    assert response.json()["quantity"] == 3
+    # Current user, UPDATE ... RETURNING and counter upsert, the row is not
+    # loaded first
+    assert query_count(response) == 3
+    response = client.delete(url, headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert query_count(response) == 3
+
+
+def test_read_plants_filtered_and_sorted(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    location = f"bed {uuid.uuid4()}"
+    rows = [
+        {"name": "Leek", "quantity": 1, "date": day, "location": location}
+        for day in ("2025-03-13", "2025-04-02", "2025-03-13", "2025-05-20")
+    ]
+    rows.append({"name": "Leek", "quantity": 1, "date": "2025-04-02"})
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json=rows,
+    )
+    ids = response.json()["ids"]
+    params: dict[str, str | int] = {
+        "location": location,
+        "date_to": "2025-04-30",
+        "sort": "-date",
+        "limit": 2,
+    }
+    pages = []
+    while True:
+        response = client.get(
+            f"{settings.API_V1_STR}/plants/",
+            headers=normal_user_token_headers,
+            params=params,
+        )
+        assert response.status_code == 200
+        content = response.json()
+        assert content["count"] == 3
+        pages.append(content["data"])
+        if content["next_cursor"] is None:
+            break
+        params["cursor"] = content["next_cursor"]
+    plants = [plant for page in pages for plant in page]
+    assert [len(page) for page in pages] == [2, 1]
+    assert [plant["date"] for plant in plants] == [
+        "2025-04-02",
+        "2025-03-13",
+        "2025-03-13",
+    ]
+    # Equal dates are ordered by id, descending like the dates
+    assert plants[0]["id"] == ids[1]
+    assert [plant["id"] for plant in plants[1:]] == sorted([ids[0], ids[2]])[::-1]
+
+
+def test_read_plants_invalid_sort(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/",
+        headers=normal_user_token_headers,
+        params={"sort": "notes"},
+    )
+    assert response.status_code == 422
+
+
+def test_search_plants(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    rows = [
+        {"name": "Kohlrabi", "quantity": 1, "date": "2025-03-13"},
+        {
+            "name": "Cabbage",
+            "quantity": 1,
+            "date": "2025-03-13",
+            "notes": "Try kohlrabe next year",
+        },
+        {"name": "Carrot", "quantity": 1, "date": "2025-03-13"},
+    ]
+    response = client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json=rows,
+    )
+    kohlrabi_id, cabbage_id, carrot_id = response.json()["ids"]
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/search",
+        headers=normal_user_token_headers,
+        params={"q": "kohlrabi"},
+    )
+    assert response.status_code == 200
+    ids = [plant["id"] for plant in response.json()["data"]]
+    # The exact name match ranks above the typo in the notes
+    assert ids[:2] == [kohlrabi_id, cabbage_id]
+    assert carrot_id not in ids
+
+
+def test_search_plants_query_too_short(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/search",
+        headers=normal_user_token_headers,
+        params={"q": "ko"},
+    )
+    assert response.status_code == 422
+
+
+def test_read_plant_names(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    rows = [
+        {"name": name, "quantity": 1, "date": "2025-03-13"}
+        for name in ("Okra Clemson", "okra Red", "Okra Clemson", "Onion")
+    ]
+    client.post(
+        f"{settings.API_V1_STR}/plants/bulk",
+        headers=normal_user_token_headers,
+        json=rows,
+    )
+    response = client.get(
+        f"{settings.API_V1_STR}/plants/names",
+        headers=normal_user_token_headers,
+        params={"prefix": "OKRA"},
+    )
+    assert response.status_code == 200
+    assert sorted(response.json()["data"]) == ["Okra Clemson", "okra Red"]
@@ -8,7 +8,7 @@ from app import crud
 from app.core.config import settings
 from app.core.security import verify_password
 from app.models import User, UserCreate
-from app.tests.utils.utils import random_email, random_lower_string
+from app.tests.utils.utils import query_count, random_email, random_lower_string
 
 
 def test_get_users_superuser_me(
@@ -56,6 +56,19 @@ def test_create_user_new_email(
         assert user.email == created_user["email"]
 
 
+def test_create_user_is_not_read_back(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    data = {"email": random_email(), "password": random_lower_string()}
+    r = client.post(
+        f"{settings.API_V1_STR}/users/", headers=superuser_token_headers, json=data
+    )
+    assert r.status_code == 200
+    assert r.json()["email"] == data["email"]
+    # Current user, email check and INSERT
+    assert query_count(r) == 3
+
+
 def test_get_existing_user(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -0,0 +1,78 @@
+import asyncio
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import create_engine, text
+
+from app.core.config import settings
+from app.core.db import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedReplicaQueuePool,
+    PoolWaitStats,
+    engine,
+    pool_status,
+)
+
+
+def test_metrics(client: TestClient, superuser_token_headers: dict[str, str]) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/metrics/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert "queued" in content["password_hasher"]
+    assert "hits" in content["user_cache"]
+    assert "hit_rate" in content["response_cache"]
+    assert content["db_pool"]["size"] == settings.DB_POOL_SIZE
+    assert content["db_pool"]["checkouts"] > 0
+    assert "replica" not in content["db_pool"]
+    assert content["db_pool"]["async"]["size"] == settings.DB_POOL_SIZE
+    assert "async_replica" not in content["db_pool"]
+
+
+def test_pool_status_replica() -> None:
+    replica = create_engine(engine.url, poolclass=InstrumentedReplicaQueuePool)
+    with replica.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    with patch("app.core.db.replica_engine", replica):
+        status = pool_status()
+    replica.dispose()
+    assert status["replica"]["checkouts"] > 0
+    assert status["checkouts"] != status["replica"]["checkouts"]
+
+
+def test_pool_status_async_waits() -> None:
+    class Pool(InstrumentedAsyncQueuePool):
+        wait_stats = PoolWaitStats()
+
+    async_single = create_async_engine(
+        engine.url, poolclass=Pool, pool_size=1, max_overflow=0
+    )
+
+    async def hold() -> None:
+        async with async_single.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            await asyncio.sleep(0.2)
+
+    async def run() -> None:
+        # Both checkouts run on the event loop thread, the second waits
+        await asyncio.gather(hold(), hold())
+        await async_single.dispose()
+
+    asyncio.run(run())
+    with patch("app.core.db.async_engine", async_single):
+        status = pool_status()
+    assert status["async"]["size"] == 1
+    stats = Pool.wait_stats.snapshot()
+    assert stats["checkouts"] == 2
+    assert stats["wait_seconds_max"] >= 0.15
+
+
+def test_metrics_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/metrics/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
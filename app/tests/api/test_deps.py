@@ -0,0 +1,197 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, create_engine
+
+from app import crud
+from app.api.deps import (
+    get_current_principal,
+    get_current_user,
+    get_read_db,
+    get_token_payload,
+)
+from app.core import security
+from app.core.config import settings
+from app.core.db import engine, recent_writers
+from app.core.invalidation import bus
+from app.models import TokenPayload, User, UserCreate, UserUpdate
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_email, random_lower_string
+
+read_db = contextmanager(get_read_db)
+
+
+@contextmanager
+def principal_session() -> Iterator[MagicMock]:
+    # The session get_current_principal opens for its lookup
+    with patch("app.api.deps.Session") as session_class:
+        yield session_class.return_value.__enter__.return_value
+
+
+def listener_connected() -> None:
+    # What the invalidation listener runs when it starts listening, in a new
+    # worker or after a reconnect
+    bus._dispatch_all()
+
+
+def token_payload(user: User) -> TokenPayload:
+    token = security.create_access_token(user, timedelta(minutes=5))
+    return get_token_payload(token)
+
+
+def test_stateless_principal_skips_user_lookup(db: Session) -> None:
+    user = crud.create_user(
+        session=db,
+        user_create=UserCreate(
+            email=random_email(), password=random_lower_string(), is_superuser=True
+        ),
+    )
+    # Tokens issued before a restart stay stateless for unchanged users
+    token_data = token_payload(user)
+    listener_connected()
+    with (
+        principal_session() as session,
+        patch("app.core.config.settings.AUTH_STATELESS_READS", True),
+        patch("app.api.deps.bus", MagicMock(connected=True)),
+    ):
+        principal = get_current_principal(token_data=token_data)
+    session.get.assert_not_called()
+    assert principal.email == user.email
+    assert principal.is_superuser
+    assert principal.id == user.id
+
+
+def test_stateless_principal_needs_connected_bus(db: Session) -> None:
+    user = create_random_user(db)
+    token_data = token_payload(user)
+    listener_connected()
+    with (
+        principal_session() as session,
+        patch("app.core.config.settings.AUTH_STATELESS_READS", True),
+        patch("app.api.deps.bus", MagicMock(connected=False)),
+    ):
+        get_current_principal(token_data=token_data)
+    session.get.assert_called_once()
+
+
+def test_stateless_principal_sees_changes_missed_before_restart(
+    db: Session,
+) -> None:
+    user = create_random_user(db)
+    token_data = token_payload(user)
+    time.sleep(1)  # iat has a resolution of a second
+    # Deactivated without telling the invalidation bus, as if by a worker
+    # whose event never arrived
+    user.is_active = False
+    db.add(user)
+    db.commit()
+    listener_connected()
+    with (
+        patch("app.core.config.settings.AUTH_STATELESS_READS", True),
+        patch("app.api.deps.bus", MagicMock(connected=True)),
+        pytest.raises(HTTPException, match="Inactive user"),
+    ):
+        get_current_principal(token_data=token_data)
+
+
+def test_stateless_principal_reloads_changed_user(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    token = superuser_token_headers["Authorization"].split(" ", 1)[1]
+    token_data = get_token_payload(token)
+    assert token_data.sub
+    crud.invalidate_user(token_data.sub)
+    with (
+        principal_session() as session,
+        patch("app.core.config.settings.AUTH_STATELESS_READS", True),
+    ):
+        get_current_principal(token_data=token_data)
+    session.get.assert_called_once()
+
+    user = crud.get_user_by_email(session=db, email=settings.FIRST_SUPERUSER)
+    assert user
+    user = crud.update_user(
+        session=db, db_user=user, user_in=UserUpdate(full_name="Changed Name")
+    )
+    with patch("app.core.config.settings.AUTH_STATELESS_READS", True):
+        r = client.post(
+            f"{settings.API_V1_STR}/login/test-token",
+            headers=superuser_token_headers,
+        )
+    assert r.status_code == 200
+    assert r.json()["full_name"] == "Changed Name"
+
+
+def test_current_user_skips_user_cache(
+    superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    token = superuser_token_headers["Authorization"].split(" ", 1)[1]
+    token_data = get_token_payload(token)
+    assert token_data.sub
+    user = crud.get_user(session=db, user_id=token_data.sub)
+    assert user
+    session = MagicMock()
+    session.get.return_value = user
+    get_current_user(session=session, token_data=token_data)
+    session.get.assert_called_once()
+
+
+def test_stateless_principal_read_endpoints(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    with patch("app.core.config.settings.AUTH_STATELESS_READS", True):
+        r = client.get(
+            f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers
+        )
+        assert r.status_code == 200
+        assert r.json()["email"] == settings.EMAIL_TEST_USER
+        r = client.get(
+            f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers
+        )
+        assert r.status_code == 200
+
+
+def test_read_db_pins_recent_writers_to_primary(
+    superuser_token_headers: dict[str, str],
+) -> None:
+    token = superuser_token_headers["Authorization"].split(" ", 1)[1]
+    token_data = get_token_payload(token)
+    assert token_data.sub
+    replica = create_engine(engine.url)
+    with patch("app.api.deps.replica_engine", replica):
+        recent_writers.invalidate(token_data.sub)
+        with read_db(token_data) as session:
+            assert session.get_bind() is replica
+        recent_writers.set(token_data.sub, True)
+        with read_db(token_data) as session:
+            assert session.get_bind() is engine
+    recent_writers.invalidate(token_data.sub)
+
+
+def test_cold_read_holds_one_connection(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    # Looking up the user must not keep a connection while the endpoint reads
+    pool = {"pool_size": 1, "max_overflow": 0, "pool_timeout": 1}
+    single = create_engine(engine.url, **pool)
+    async_single = create_async_engine(engine.url, **pool)
+    with (
+        patch("app.api.deps.engine", single),
+        patch("app.api.deps.replica_engine", single),
+        patch("app.api.deps.async_engine", async_single),
+        patch("app.api.deps.async_replica_engine", async_single),
+    ):
+        for path in ("/users/me", "/plants/", "/items/"):
+            crud.user_cache.clear()
+            r = client.get(
+                f"{settings.API_V1_STR}{path}", headers=normal_user_token_headers
+            )
+            assert r.status_code == 200
+    single.dispose()
@@ -0,0 +1,76 @@
+import threading
+import time
+import uuid
+
+from app import crud
+from app.core.invalidation import (
+    ALL_KEYS,
+    InvalidationBus,
+    PostgresInvalidationBus,
+    postgres_conninfo,
+)
+
+
+def test_local_bus_dispatches_to_subscribers() -> None:
+    bus = InvalidationBus()
+    received: list[str] = []
+    bus.subscribe("plant", received.append)
+    bus.publish("plant", "a")
+    bus.publish("item", "b")
+    bus._dispatch_all()
+    assert received == ["a", ALL_KEYS]
+
+
+def test_invalidate_user_evicts_cached_user() -> None:
+    user_id = str(uuid.uuid4())
+    crud.user_cache.set(user_id, {"id": user_id})
+    crud.invalidate_user(user_id)
+    assert crud.user_cache.get(user_id) is None
+
+
+def test_postgres_bus_reaches_other_workers() -> None:
+    channel = f"test_{uuid.uuid4().hex}"
+    publisher = PostgresInvalidationBus(conninfo=postgres_conninfo(), channel=channel)
+    listener = PostgresInvalidationBus(conninfo=postgres_conninfo(), channel=channel)
+    own: list[str] = []
+    received: list[str] = []
+    delivered = threading.Event()
+    publisher.subscribe("plant", own.append)
+
+    def handle(key: str) -> None:
+        received.append(key)
+        if key == "owner":
+            delivered.set()
+
+    listener.subscribe("plant", handle)
+    listener.start()
+    try:
+        deadline = time.monotonic() + 10
+        while not listener.connected and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert listener.connected
+        # Events published before LISTEN may have been missed
+        assert received == [ALL_KEYS]
+        publisher.publish("plant", "owner")
+        assert delivered.wait(10)
+    finally:
+        listener.stop()
+        publisher.stop()
+    assert not listener.connected
+    assert own == ["owner"]
+
+
+def test_postgres_bus_publish_does_not_wait_for_the_database() -> None:
+    # Nothing listens on port 9, connecting fails
+    bus = PostgresInvalidationBus(
+        conninfo="host=127.0.0.1 port=9 connect_timeout=5", channel="unreachable"
+    )
+    received: list[str] = []
+    bus.subscribe("plant", received.append)
+    start = time.monotonic()
+    for _ in range(100):
+        bus.publish("plant", "owner")
+    assert time.monotonic() - start < 1
+    assert len(received) == 100
+    bus.stop()
+    assert not bus.connected
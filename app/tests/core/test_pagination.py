@@ -0,0 +1,65 @@
+import uuid
+from datetime import date
+
+import pytest
+
+from app.core.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    decode_sorted_cursor,
+    encode_cursor,
+    split_page,
+)
+from app.models import Plant
+
+
+class Row:
+    def __init__(self) -> None:
+        self.id = uuid.uuid4()
+
+
+def test_cursor_round_trip() -> None:
+    row_id = uuid.uuid4()
+    cursor = encode_cursor(row_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == row_id
+
+
+@pytest.mark.parametrize("cursor", ["", "abc", "not a cursor", "é"])
+def test_decode_invalid_cursor(cursor: str) -> None:
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_split_page_with_next_page() -> None:
+    rows = [Row() for _ in range(3)]
+    page, next_cursor = split_page(rows, 2)
+    assert page == rows[:2]
+    assert next_cursor is not None
+    assert decode_cursor(next_cursor) == rows[1].id
+
+
+def test_split_page_last_page() -> None:
+    rows = [Row() for _ in range(2)]
+    assert split_page(rows, 2) == (rows, None)
+    assert split_page([], 2) == ([], None)
+    assert split_page(rows, 0) == ([], None)
+
+
+def test_sorted_cursor_round_trip() -> None:
+    plant = Plant(id=uuid.uuid4(), name="Tomato", quantity=2, date=date(2025, 3, 13))
+    page, next_cursor = split_page([plant, plant], 1, "date")
+    assert next_cursor is not None
+    assert decode_sorted_cursor(next_cursor, Plant.date) == (plant.date, plant.id)
+    _, next_cursor = split_page([plant, plant], 1, "name")
+    assert next_cursor is not None
+    assert decode_sorted_cursor(next_cursor, Plant.name) == ("Tomato", plant.id)
+
+
+def test_decode_sorted_cursor_mismatch() -> None:
+    with pytest.raises(InvalidCursorError):
+        decode_sorted_cursor(encode_cursor(uuid.uuid4()), Plant.date)
+    with pytest.raises(InvalidCursorError):
+        decode_sorted_cursor(encode_cursor(uuid.uuid4(), "tomato"), Plant.date)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(uuid.uuid4(), "2025-03-13"))
@@ -0,0 +1,145 @@
+import uuid
+
+import pytest
+from fastapi import Request
+from pydantic import ValidationError
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import Settings, settings
+from app.core.db import recent_writers
+from app.core.invalidation import ALL_KEYS, bus
+from app.core.response_cache import LocalResponseCacheBackend, response_cache
+from app.models import Item, ItemCreate, Message
+from app.tests.utils.user import create_random_user
+
+
+def make_request(path: str, query: str = "", etag: str | None = None) -> Request:
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query.encode(),
+            "headers": headers,
+        }
+    )
+
+
+def test_key_ignores_query_order() -> None:
+    owner_id = uuid.uuid4()
+    first = response_cache.key(
+        make_request("/plants/", "limit=5&skip=0"), "plant", owner_id
+    )
+    second = response_cache.key(
+        make_request("/plants/", "skip=0&limit=5"), "plant", owner_id
+    )
+    assert first is not None
+    assert first == second
+    assert response_cache.key(make_request("/plants/"), "plant", None) is None
+
+
+def test_key_skips_recent_writers() -> None:
+    owner_id = uuid.uuid4()
+    recent_writers.set(str(owner_id), True)
+    try:
+        assert response_cache.key(make_request("/plants/"), "plant", owner_id) is None
+    finally:
+        recent_writers.invalidate(str(owner_id))
+    assert response_cache.key(make_request("/plants/"), "plant", owner_id)
+
+
+def test_key_skips_owners_written_by_others(db: Session) -> None:
+    owner = create_random_user(db)
+    item = crud.create_item(
+        session=db, item_in=ItemCreate(title="t"), owner_id=owner.id
+    )
+    superuser = crud.get_user_by_email(session=db, email=settings.FIRST_SUPERUSER)
+    assert superuser
+    # Written by a superuser, the owner's reads are not cached
+    db.info["user_id"] = superuser.id
+    try:
+        recent_writers.invalidate(str(owner.id))
+        crud.update_owned(
+            session=db, model=Item, id=item.id, owner_id=None, values={"title": "u"}
+        )
+        assert response_cache.key(make_request("/items/"), "item", owner.id) is None
+        recent_writers.invalidate(str(owner.id))
+        crud.bulk_update(
+            session=db, model=Item, criteria=[Item.id == item.id], values={"title": "v"}
+        )
+        assert response_cache.key(make_request("/items/"), "item", owner.id) is None
+    finally:
+        db.info.pop("user_id")
+        recent_writers.invalidate(str(owner.id))
+
+
+def test_local_invalidation_needs_single_worker() -> None:
+    with pytest.raises(ValidationError, match="WEB_CONCURRENCY"):
+        Settings(CACHE_INVALIDATION_BACKEND="local", WEB_CONCURRENCY=2)  # type: ignore[call-arg]
+    Settings(CACHE_INVALIDATION_BACKEND="local", WEB_CONCURRENCY=1)  # type: ignore[call-arg]
+
+
+def test_put_and_get() -> None:
+    request = make_request("/items/")
+    key = response_cache.key(request, "item", uuid.uuid4())
+    assert response_cache.get(request, key) is None
+    response = response_cache.put(key, Message(message="hi"), etag='W/"1"')
+    assert response.body == b'{"message":"hi"}'
+    cached = response_cache.get(request, key)
+    assert cached is not None
+    assert cached.body == response.body
+    assert cached.headers["etag"] == 'W/"1"'
+    cached = response_cache.get(make_request("/items/", etag='W/"1"'), key)
+    assert cached is not None
+    assert cached.status_code == 304
+
+
+def test_put_without_key_only_serializes() -> None:
+    stats = response_cache.backend.stats()
+    response = response_cache.put(None, Message(message="hi"), etag='"x"')
+    assert response.body == b'{"message":"hi"}'
+    assert response.headers["ETag"] == '"x"'
+    assert response_cache.backend.stats()["size"] == stats["size"]
+
+
+def test_write_event_changes_key() -> None:
+    owner_id = uuid.uuid4()
+    request = make_request("/plants/")
+    key = response_cache.key(request, "plant", owner_id)
+    response_cache.put(key, Message(message="old"))
+    bus.publish("plant", str(owner_id))
+    new_key = response_cache.key(request, "plant", owner_id)
+    assert new_key != key
+    assert response_cache.get(request, new_key) is None
+
+
+def test_local_backend_generations() -> None:
+    backend = LocalResponseCacheBackend(maxsize=2, ttl=60)
+    generation = backend.generation("plant:a")
+    assert backend.generation("plant:a") == generation
+    backend.bump("plant:a")
+    assert backend.generation("plant:a") > generation
+    generation = backend.generation("plant:a")
+    backend.clear()
+    assert backend.generation("plant:a") > generation
+
+
+def test_local_backend_evicts_least_recently_used() -> None:
+    backend = LocalResponseCacheBackend(maxsize=2, ttl=60)
+    for key in ("a", "b", "c"):
+        backend.set(key, (None, key.encode()))
+    assert backend.get("a") is None
+    assert backend.get("c") == (None, b"c")
+    stats = backend.stats()
+    assert stats["evictions"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_all_keys_event_clears_backend() -> None:
+    request = make_request("/items/")
+    key = response_cache.key(request, "item", uuid.uuid4())
+    response_cache.put(key, Message(message="hi"))
+    response_cache._invalidate("item", ALL_KEYS)
+    assert response_cache.backend.get(key) is None  # type: ignore[arg-type]
@@ -0,0 +1,24 @@
+import uuid
+from datetime import date
+
+from fastapi.responses import JSONResponse
+
+from app.core.responses import FastJSONResponse, model_response
+from app.models import Plant, PlantsPublic
+
+
+def test_fast_json_response_matches_json_response() -> None:
+    content = {"detail": "Ünïcode", "data": [1, 2.5, None, True], "nested": {}}
+    assert FastJSONResponse(content).body == JSONResponse(content).body
+
+
+def test_model_response() -> None:
+    plant = Plant(id=uuid.uuid4(), name="Tomato", quantity=2, date=date(2025, 3, 13))
+    response = model_response(
+        PlantsPublic(data=[plant], count=1), headers={"ETag": '"x"'}
+    )
+    assert response.media_type == "application/json"
+    assert response.headers["ETag"] == '"x"'
+    assert (
+        response.body == PlantsPublic(data=[plant], count=1).model_dump_json().encode()
+    )
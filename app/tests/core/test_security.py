@@ -0,0 +1,48 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.security import (
+    PasswordHasher,
+    PasswordHasherBusyError,
+    get_password_hash_async,
+    get_password_hash_bounded,
+    password_hasher,
+    verify_password,
+    verify_password_async,
+    verify_password_bounded,
+)
+
+
+def test_password_hash_async_round_trip() -> None:
+    hashed = asyncio.run(get_password_hash_async("a-long-password"))
+    assert verify_password("a-long-password", hashed)
+    assert asyncio.run(verify_password_async("a-long-password", hashed))
+    assert not asyncio.run(verify_password_async("wrong-password", hashed))
+
+
+def test_password_hash_bounded_runs_on_hasher() -> None:
+    completed = password_hasher.stats()["completed"]
+    hashed = get_password_hash_bounded("a-long-password")
+    assert verify_password("a-long-password", hashed)
+    assert password_hasher.stats()["completed"] == completed + 1
+    assert verify_password_bounded("a-long-password", hashed)
+    assert password_hasher.stats()["completed"] == completed + 2
+
+
+def test_password_hasher_rejects_when_full() -> None:
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+    release = threading.Event()
+    running = hasher.submit(release.wait)
+    queued = hasher.submit(release.wait)
+    stats = hasher.stats()
+    assert stats["queued"] + stats["running"] == 2
+    with pytest.raises(PasswordHasherBusyError):
+        hasher.submit(release.wait)
+    release.set()
+    assert running.result() and queued.result()
+    stats = hasher.stats()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
+    assert stats["queued"] == 0
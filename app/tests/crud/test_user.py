@@ -89,3 +89,28 @@ def test_update_user(db: Session) -> None:
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+def test_get_user_by_email_uses_cache(db: Session) -> None:
+    email = random_email()
+    user_in = UserCreate(email=email, password=random_lower_string())
+    user = crud.create_user(session=db, user_create=user_in)
+    crud.invalidate_user(user.id)
+    hits = crud.user_cache.stats()["hits"]
+    user_2 = crud.get_user_by_email(session=db, email=email)
+    user_3 = crud.get_user_by_email(session=db, email=email)
+    assert user_2 and user_3
+    assert user_3.id == user.id
+    assert crud.user_cache.stats()["hits"] == hits + 1
+
+
+def test_update_user_invalidates_cache(db: Session) -> None:
+    email = random_email()
+    user_in = UserCreate(email=email, password=random_lower_string())
+    user = crud.create_user(session=db, user_create=user_in)
+    assert crud.get_user(session=db, user_id=user.id)
+    new_email = random_email()
+    crud.update_user(session=db, db_user=user, user_in=UserUpdate(email=new_email))
+    assert crud.get_user_by_email(session=db, email=email) is None
+    cached = crud.get_user(session=db, user_id=user.id)
+    assert cached and cached.email == new_email
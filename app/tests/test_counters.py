@@ -0,0 +1,181 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, func, select
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+from app.counters import RECONCILE_LOCK_KEY, list_count_statement, reconcile_counts
+from app.models import Item, ItemCreate, OwnerCount, Plant
+from app.tests.utils.plants import create_random_plant
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import query_count
+
+
+def owner_count(db: Session, owner_id: uuid.UUID) -> int:
+    statement = list_count_statement(Item, owner_id)
+    assert statement is not None
+    return db.exec(statement).one()
+
+
+def test_counter_follows_creates_and_deletes(db: Session) -> None:
+    user = create_random_user(db)
+    assert owner_count(db, user.id) == 0
+    items = [
+        crud.create_item(session=db, item_in=ItemCreate(title="t"), owner_id=user.id)
+        for _ in range(3)
+    ]
+    assert owner_count(db, user.id) == 3
+    db.delete(items[0])
+    db.commit()
+    assert owner_count(db, user.id) == 2
+
+
+def test_counter_total_matches_exact_count(db: Session) -> None:
+    # Plants without an owner are in the total too
+    create_random_plant(db)
+    for model in (Plant, Item):
+        statement = list_count_statement(model, None)
+        assert statement is not None
+        exact = db.exec(select(func.count()).select_from(model)).one()
+        assert db.exec(statement).one() == exact
+
+
+def test_counter_follows_owner_change(db: Session) -> None:
+    user = create_random_user(db)
+    other = create_random_user(db)
+    item = crud.create_item(session=db, item_in=ItemCreate(title="t"), owner_id=user.id)
+    item.owner_id = other.id
+    db.add(item)
+    db.commit()
+    assert owner_count(db, user.id) == 0
+    assert owner_count(db, other.id) == 1
+
+
+def test_counter_rows_deleted_with_owner(db: Session) -> None:
+    user = create_random_user(db)
+    crud.create_item(session=db, item_in=ItemCreate(title="t"), owner_id=user.id)
+    db.delete(user)
+    db.commit()
+    assert db.get(OwnerCount, (user.id, "item")) is None
+
+
+def test_version_follows_writes(db: Session) -> None:
+    user = create_random_user(db)
+    item = crud.create_item(session=db, item_in=ItemCreate(title="t"), owner_id=user.id)
+    counter = db.get(OwnerCount, (user.id, "item"))
+    assert counter
+    version = counter.version
+    item.title = "u"
+    db.add(item)
+    db.commit()
+    db.refresh(counter)
+    assert counter.version == version + 1
+    assert counter.count == 1
+
+
+def test_reconcile_counts(db: Session) -> None:
+    user = create_random_user(db)
+    crud.create_item(session=db, item_in=ItemCreate(title="t"), owner_id=user.id)
+    counter = db.get(OwnerCount, (user.id, "item"))
+    assert counter
+    counter.count = 42
+    db.add(counter)
+    db.commit()
+    assert reconcile_counts(db) >= 1
+    db.refresh(counter)
+    assert counter.count == 1
+    assert reconcile_counts(db) == 0
+
+
+def reconcile_in_new_session() -> int:
+    with Session(engine) as session:
+        return reconcile_counts(session)
+
+
+def test_reconcile_counts_waits_for_writes(db: Session) -> None:
+    user = create_random_user(db)
+    crud.create_item(session=db, item_in=ItemCreate(title="t"), owner_id=user.id)
+    with Session(engine) as writer, ThreadPoolExecutor(1) as executor:
+        writer.add(Item(title="t", owner_id=user.id))
+        writer.flush()
+        # The reconcile starts while the write is in progress
+        reconciled = executor.submit(reconcile_in_new_session)
+        time.sleep(0.3)
+        assert not reconciled.done()
+        writer.commit()
+        reconciled.result(timeout=10)
+    assert owner_count(db, user.id) == 2
+
+
+def test_reconcile_counts_one_at_a_time(db: Session) -> None:
+    user = create_random_user(db)
+    crud.create_item(session=db, item_in=ItemCreate(title="t"), owner_id=user.id)
+    counter = db.get(OwnerCount, (user.id, "item"))
+    assert counter
+    counter.count = 42
+    db.add(counter)
+    db.commit()
+    with Session(engine) as other:
+        other.exec(select(func.pg_advisory_xact_lock(RECONCILE_LOCK_KEY)))
+        assert reconcile_in_new_session() == 0
+    assert reconcile_in_new_session() >= 1
+    assert owner_count(db, user.id) == 1
+
+
+def test_read_items_without_count(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"include_count": False},
+    )
+    assert r.status_code == 200
+    assert r.json()["count"] is None
+
+
+def test_window_count(db: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    user = create_random_user(db)
+    for _ in range(3):
+        crud.create_item(session=db, item_in=ItemCreate(title="t"), owner_id=user.id)
+    monkeypatch.setattr(settings, "LIST_COUNT_MODE", "window")
+    page, count, next_cursor = crud.get_page(
+        session=db, model=Item, owner_id=user.id, limit=2
+    )
+    assert len(page) == 2
+    assert count == 3
+    assert next_cursor
+    page, count, next_cursor = crud.get_page(
+        session=db, model=Item, owner_id=user.id, cursor=next_cursor, limit=2
+    )
+    assert len(page) == 1
+    assert count == 3
+    assert next_cursor is None
+    # Past the last row the count comes from a separate query
+    page, count, _ = crud.get_page(session=db, model=Item, owner_id=user.id, skip=10)
+    assert page == []
+    assert count == 3
+
+
+def test_read_items_window_count_single_query(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Served from the response cache, the listing would run no query
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_MAXSIZE", 0)
+    url = f"{settings.API_V1_STR}/items/"
+    # A page past the last row needs a separate count
+    client.post(url, headers=normal_user_token_headers, json={"title": "Foo"})
+    client.get(url, headers=normal_user_token_headers)  # warm the user cache
+    r = client.get(url, headers=normal_user_token_headers)
+    two_queries = query_count(r)
+    monkeypatch.setattr(settings, "LIST_COUNT_MODE", "window")
+    r = client.get(url, headers=normal_user_token_headers)
+    assert r.status_code == 200
+    assert query_count(r) == two_queries - 1
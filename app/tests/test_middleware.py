@@ -0,0 +1,110 @@
+import zlib
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.middleware import (
+    CompressionMiddleware,
+    QueryBudgetExceededError,
+    StreamingGZipResponder,
+)
+from app.tests.utils.utils import query_count
+
+compressed_app = FastAPI()
+compressed_app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+
+@compressed_app.get("/rows")
+def rows(n: int = 100) -> Response:
+    return Response(b"row\n" * n, headers={"ETag": '"rows"'})
+
+
+@compressed_app.get("/stream")
+def stream() -> StreamingResponse:
+    return StreamingResponse(b"row\n" * 100 for _ in range(3))
+
+
+def test_server_timing_reports_queries(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers)
+    assert r.status_code == 200
+    assert r.headers["Server-Timing"].startswith("db;dur=")
+    # count + page
+    assert query_count(r) >= 2
+
+
+def test_server_timing_without_queries(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/utils/health-check/")
+    assert r.status_code == 200
+    assert query_count(r) == 0
+
+
+def test_query_budget_strict(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # A response served from the response cache runs no query
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_MAXSIZE", 0)
+    monkeypatch.setattr(settings, "SQL_QUERY_BUDGET", 1)
+    monkeypatch.setattr(settings, "SQL_QUERY_BUDGET_STRICT", True)
+    with pytest.raises(QueryBudgetExceededError):
+        client.get(f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers)
+
+
+def test_query_budget_warns(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_MAXSIZE", 0)
+    monkeypatch.setattr(settings, "SQL_QUERY_BUDGET", 1)
+    r = client.get(f"{settings.API_V1_STR}/plants/", headers=normal_user_token_headers)
+    assert r.status_code == 200
+    assert "over the budget of 1" in caplog.text
+
+
+def test_compression_gzip() -> None:
+    with TestClient(compressed_app) as client:
+        r = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert r.headers["ETag"] == 'W/"rows"'
+    assert r.headers["Vary"] == "Accept-Encoding"
+    assert r.content == b"row\n" * 100
+
+
+def test_compression_skips_small_and_unaccepted() -> None:
+    with TestClient(compressed_app) as client:
+        small = client.get("/rows?n=10", headers={"Accept-Encoding": "gzip"})
+        refused = client.get("/rows", headers={"Accept-Encoding": "gzip;q=0"})
+    for r in (small, refused):
+        assert "Content-Encoding" not in r.headers
+        assert r.headers["ETag"] == '"rows"'
+
+
+def test_compression_of_exports(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/plants/export",
+        headers={**normal_user_token_headers, "Accept-Encoding": "gzip"},
+        params={"format": "csv"},
+    )
+    assert r.status_code == 200
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert r.text.startswith("name,")
+
+
+def test_streaming_gzip_flushes_chunks() -> None:
+    responder = StreamingGZipResponder(compressed_app, minimum_size=0)
+    decompressor = zlib.decompressobj(wbits=31)
+    # Every chunk decompresses to its rows without waiting for the next one
+    for _ in range(3):
+        chunk = responder.apply_compression(b"row\n" * 100, more_body=True)
+        assert decompressor.decompress(chunk) == b"row\n" * 100
+    responder.apply_compression(b"", more_body=False)
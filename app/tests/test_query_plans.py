@@ -0,0 +1,133 @@
+import uuid
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import Session, select
+
+from app import crud
+from app.core.pagination import encode_cursor
+from app.models import Item, Plant, PlantFilters, Reminder
+from app.tests.utils.item import create_random_item
+from app.tests.utils.plants import create_random_plant
+from app.tests.utils.user import create_random_user
+
+# Hot queries of the plants and items listings (with their filters and sorts),
+# plant search and the due reminders job must be served by an index.
+# Sequential scans are disabled so the planner picks an index whenever one
+# exists, which keeps the plans deterministic on small test tables.
+
+
+@pytest.fixture(scope="module")
+def seeded(db: Session) -> dict[str, Any]:
+    user = create_random_user(db)
+    for _ in range(20):
+        plant = create_random_plant(db)
+        plant.owner_id = user.id
+        db.add(plant)
+        db.add(
+            Reminder(
+                plant_id=plant.id,
+                reminder_type="water",
+                remind_time=datetime.now(timezone.utc) + timedelta(days=1),
+            )
+        )
+    db.commit()
+    item = create_random_item(db)
+    return {"owner_id": user.id, "item_owner_id": item.owner_id}
+
+
+@pytest.fixture()
+def plan_session(db: Session, seeded: dict[str, Any]) -> Generator[Session, None, None]:
+    _ = seeded
+    db.connection().exec_driver_sql("SET LOCAL enable_seqscan = off")
+    yield db
+    db.rollback()
+
+
+def explain(session: Session, statement: Any) -> str:
+    compiled = statement.compile(dialect=session.get_bind().dialect)
+    rows = session.connection().exec_driver_sql(f"EXPLAIN {compiled}", compiled.params)
+    return "\n".join(row[0] for row in rows)
+
+
+def assert_no_seq_scan(session: Session, statement: Any) -> None:
+    plan = explain(session, statement)
+    assert "Seq Scan" not in plan, plan
+
+
+def assert_page_served_by_index(session: Session, **kwargs: Any) -> None:
+    # The statements get_page runs, in each way of counting the rows
+    for mode in ("counter", "exact", "window"):
+        with patch("app.core.config.settings.LIST_COUNT_MODE", mode):
+            statement, count_statement, _ = crud.page_statements(**kwargs)
+        assert_no_seq_scan(session, statement)
+        assert count_statement is not None
+        assert_no_seq_scan(session, count_statement)
+
+
+def test_plants_by_owner_plan(plan_session: Session, seeded: dict[str, Any]) -> None:
+    assert_page_served_by_index(
+        plan_session,
+        model=Plant,
+        owner_id=seeded["owner_id"],
+        cursor=encode_cursor(uuid.uuid4()),
+    )
+
+
+def test_items_by_owner_plan(plan_session: Session, seeded: dict[str, Any]) -> None:
+    assert_page_served_by_index(
+        plan_session,
+        model=Item,
+        owner_id=seeded["item_owner_id"],
+        cursor=encode_cursor(uuid.uuid4()),
+    )
+
+
+def test_due_reminders_plan(plan_session: Session) -> None:
+    now = datetime.now(timezone.utc)
+    assert_no_seq_scan(plan_session, crud.due_reminders_statement(now))
+
+
+def test_reminders_by_plant_plan(plan_session: Session) -> None:
+    plant_id = plan_session.exec(select(Reminder.plant_id).limit(1)).one()
+    assert_no_seq_scan(
+        plan_session, select(Reminder).where(Reminder.plant_id == plant_id)
+    )
+
+
+def test_plant_search_plan(plan_session: Session) -> None:
+    # Across owners, only the trigram indexes can serve it
+    plan = explain(plan_session, crud.search_plants_statement("tomatoe", None))
+    assert "Seq Scan" not in plan, plan
+    assert "_trgm" in plan, plan
+    assert_no_seq_scan(plan_session, crud.plant_names_statement("tom", None, 10))
+
+
+def test_plants_filtered_and_sorted_plan(
+    plan_session: Session, seeded: dict[str, Any]
+) -> None:
+    owner_id = seeded["owner_id"]
+    for sort, key in (("-date", "2025-03-13"), ("name", "Basil"), ("-quantity", 3)):
+        page: dict[str, Any] = {
+            "model": Plant,
+            "owner_id": owner_id,
+            "cursor": encode_cursor(uuid.uuid4(), key),
+            "sort": sort,
+        }
+        assert_page_served_by_index(plan_session, **page)
+        # Unless the page is windowed, the index also gives its order
+        with patch("app.core.config.settings.LIST_COUNT_MODE", "exact"):
+            statement, _, _ = crud.page_statements(**page)
+        plan = explain(plan_session, statement)
+        assert f"ix_plant_owner_id_{sort.removeprefix('-')}_id" in plan, plan
+        assert "Sort" not in plan, plan
+    assert_page_served_by_index(
+        plan_session,
+        model=Plant,
+        owner_id=owner_id,
+        cursor=encode_cursor(uuid.uuid4()),
+        criteria=crud.plant_filter_criteria(PlantFilters(location="bed 3")),
+    )
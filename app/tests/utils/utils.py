@@ -1,7 +1,9 @@
 import random
+import re
 import string
 
 from fastapi.testclient import TestClient
+from httpx import Response
 
 from app.core.config import settings
 
@@ -24,3 +26,10 @@ def get_superuser_token_headers(client: TestClient) -> dict[str, str]:
     a_token = tokens["access_token"]
     headers = {"Authorization": f"Bearer {a_token}"}
     return headers
+
+
+def query_count(response: Response) -> int:
+    """Number of SQL statements the request ran, from its Server-Timing header."""
+    match = re.search(r'desc="(\d+) queries"', response.headers["Server-Timing"])
+    assert match, response.headers["Server-Timing"]
+    return int(match.group(1))
@@ -0,0 +1,79 @@
+"""
+Requests/sec of token-authenticated read endpoints when the user is looked up
+in the database on every request (as with USER_CACHE_MAXSIZE=0), found in the
+user cache, or built from the token claims with AUTH_STATELESS_READS.
+
+The response cache is turned off so every request reads the database. Run
+against a migrated database from the project root, with the "postgres"
+CACHE_INVALIDATION_BACKEND that stateless reads need:
+
+    python scripts/bench_auth.py --requests 2000
+"""
+
+import argparse
+import time
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app import crud
+from app.core.config import settings
+from app.core.invalidation import bus
+from app.main import app
+from app.tests.utils.utils import get_superuser_token_headers
+
+# Mode: (AUTH_STATELESS_READS, user cache maxsize)
+MODES = {
+    "db lookup": (False, 0),
+    "user cache": (False, settings.USER_CACHE_MAXSIZE),
+    "stateless": (True, 0),
+}
+
+
+def run(
+    client: TestClient, headers: dict[str, str], method: str, path: str, n: int
+) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        r = client.request(method, f"{settings.API_V1_STR}{path}", headers=headers)
+        r.raise_for_status()
+    return n / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    with (
+        TestClient(app) as client,
+        patch("app.core.config.settings.RESPONSE_CACHE_MAXSIZE", 0),
+    ):
+        deadline = time.monotonic() + 10
+        while not bus.connected and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if not bus.connected:
+            raise SystemExit("The invalidation listener is not connected")
+        headers = get_superuser_token_headers(client)
+        for method, path in [("POST", "/login/test-token"), ("GET", "/plants/")]:
+            results = {}
+            for mode, (stateless, maxsize) in MODES.items():
+                with (
+                    patch("app.core.config.settings.AUTH_STATELESS_READS", stateless),
+                    patch.object(crud.user_cache, "maxsize", maxsize),
+                ):
+                    crud.user_cache.clear()
+                    run(client, headers, method, path, 50)  # warm up
+                    results[mode] = run(client, headers, method, path, args.requests)
+            baseline = results["db lookup"]
+            print(
+                f"{method} {path}: "
+                + ", ".join(
+                    f"{mode} {rate:.0f} req/s ({rate / baseline:.2f}x)"
+                    for mode, rate in results.items()
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Throughput of creating plants on a running server, one POST /plants/ per
+plant versus POST /plants/bulk with batches of rows and POST /plants/import
+with all of them in one CSV file, e.g.:
+
+    fastapi run --workers 1 app/main.py
+    python scripts/bench_bulk_plants.py --plants 500 --batch-size 500
+
+The plants are created for the superuser; delete them afterwards if needed.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import time
+
+import httpx
+
+
+def plant(i: int) -> dict[str, object]:
+    return {"name": f"bench plant {i}", "quantity": 1, "date": "2025-03-13"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--plants", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--email", default=os.environ.get("FIRST_SUPERUSER"))
+    parser.add_argument(
+        "--password", default=os.environ.get("FIRST_SUPERUSER_PASSWORD")
+    )
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.url, timeout=60) as client:
+        r = client.post(
+            "/api/v1/login/access-token",
+            data={"username": args.email, "password": args.password},
+        )
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        start = time.perf_counter()
+        for i in range(args.plants):
+            client.post(
+                "/api/v1/plants/", headers=headers, json=plant(i)
+            ).raise_for_status()
+        single = time.perf_counter() - start
+
+        rows = [plant(i) for i in range(args.plants)]
+        batches = [
+            rows[i : i + args.batch_size] for i in range(0, len(rows), args.batch_size)
+        ]
+        start = time.perf_counter()
+        for batch in batches:
+            client.post(
+                "/api/v1/plants/bulk", headers=headers, json=batch
+            ).raise_for_status()
+        bulk = time.perf_counter() - start
+
+        ndjson_headers = {**headers, "Content-Type": "application/x-ndjson"}
+        start = time.perf_counter()
+        for batch in batches:
+            client.post(
+                "/api/v1/plants/bulk",
+                headers=ndjson_headers,
+                content="\n".join(json.dumps(row) for row in batch),
+            ).raise_for_status()
+        ndjson = time.perf_counter() - start
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+        start = time.perf_counter()
+        client.post(
+            "/api/v1/plants/import",
+            headers=headers,
+            files={"file": ("plants.csv", buffer.getvalue(), "text/csv")},
+        ).raise_for_status()
+        csv_import = time.perf_counter() - start
+
+    results = (
+        ("single", single),
+        ("bulk", bulk),
+        ("ndjson", ndjson),
+        ("import", csv_import),
+    )
+    for name, elapsed in results:
+        print(
+            f"{name:7} {args.plants / elapsed:10.0f} plants/s "
+            f"({elapsed * 1000:.0f} ms for {args.plants})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Load test of a running server: keeps a fixed number of requests in flight
+against an endpoint and reports throughput and latency percentiles.
+
+Start the server once with ASYNC_DB=false and once with ASYNC_DB=true (same
+worker count) and compare, e.g.:
+
+    fastapi run --workers 1 app/main.py
+    python scripts/bench_concurrency.py --concurrency 200 --path /api/v1/plants/
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    r = await client.post(
+        "/api/v1/login/access-token", data={"username": email, "password": password}
+    )
+    r.raise_for_status()
+    return str(r.json()["access_token"])
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/api/v1/plants/")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--email", default=os.environ.get("FIRST_SUPERUSER"))
+    parser.add_argument(
+        "--password", default=os.environ.get("FIRST_SUPERUSER_PASSWORD")
+    )
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.url, limits=limits, timeout=60
+    ) as client:
+        token = await login(client, args.email, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+        latencies: list[float] = []
+        errors = 0
+        deadline = time.perf_counter() + args.seconds
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                r = await client.get(args.path, headers=headers)
+                if r.status_code != 200:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{len(latencies) / elapsed:.0f} req/s with {args.concurrency} in flight, "
+        f"p50 {quantiles[49] * 1000:.1f} ms, p99 {quantiles[98] * 1000:.1f} ms, "
+        f"{errors} errors"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
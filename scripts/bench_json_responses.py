@@ -0,0 +1,102 @@
+"""
+Time to turn a page of plant rows into a JSON response body, the way FastAPI
+does it for a route returning PlantsPublic with response_model=PlantsPublic
+(validated again, dumped to dicts, encoded by JSONResponse or
+FastJSONResponse) versus returning model_response(PlantsPublic(...)).
+
+Needs no database or server, e.g.:
+
+    python scripts/bench_json_responses.py --pages 100 1000 10000 --repeat 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from collections.abc import Callable
+from datetime import date
+
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.responses import FastJSONResponse, model_response
+from app.models import Plant, PlantsPublic
+
+RESPONSE_FIELD = create_model_field(
+    name="Response_read_plants", type_=PlantsPublic, mode="serialization"
+)
+
+
+def plants(rows: int) -> list[Plant]:
+    owner_id = uuid.uuid4()
+    return [
+        Plant(
+            id=uuid.uuid4(),
+            owner_id=owner_id,
+            name=f"plant {i}",
+            cultivar="Cherokee Purple",
+            quantity=i,
+            date=date.today(),
+            location="bed 3",
+            days_to_germ=7,
+            days_to_maturity=80,
+        )
+        for i in range(rows)
+    ]
+
+
+def response_model_path(response_class: type[JSONResponse]) -> Callable:
+    def render(rows: list[Plant]) -> Response:
+        content = asyncio.run(
+            serialize_response(
+                field=RESPONSE_FIELD,
+                response_content=PlantsPublic(data=rows, count=len(rows)),
+                exclude_unset=True,
+            )
+        )
+        return response_class(content)
+
+    return render
+
+
+def direct_path(rows: list[Plant]) -> Response:
+    return model_response(PlantsPublic(data=rows, count=len(rows)), exclude_unset=True)
+
+
+PATHS = {
+    "response_model + JSONResponse": response_model_path(JSONResponse),
+    "response_model + FastJSONResponse": response_model_path(FastJSONResponse),
+    "model_response": direct_path,
+}
+
+
+def measure(render: Callable, rows: list[Plant], repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = render(rows).body
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    for size in args.pages:
+        rows = plants(size)
+        bodies = set()
+        for name, render in PATHS.items():
+            p50, length = measure(render, rows, args.repeat)
+            bodies.add(render(rows).body)
+            print(f"{size:6} plants  {name:34} p50 {p50:9.2f} ms  {length} bytes")
+        if len(bodies) != 1:
+            print(f"{size:6} plants  warning: the bodies differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Compares the ways plant listings get their count on an owner with many rows:
+a separate COUNT(*) query ("exact"), count(*) OVER () in the page query
+("window") and the ownercount table ("counter"), for the first page, a deep
+offset page and a cursor page.
+
+Runs against the configured database, after the migrations, e.g.:
+
+    python scripts/bench_list_counts.py --rows 100000 --repeat 50
+
+The owner and its plants are created for the run and deleted afterwards.
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+from datetime import date
+
+from sqlalchemy import insert
+from sqlmodel import Session, delete
+
+from app import crud
+from app.core.config import settings
+from app.core.db import QueryStats, current_query_stats, engine
+from app.counters import adjust_counts
+from app.models import Plant, User
+
+MODES = ("exact", "window", "counter")
+
+
+def seed(session: Session, rows: int) -> uuid.UUID:
+    owner = User(
+        email=f"bench-{uuid.uuid4().hex}@example.com",
+        hashed_password="-",
+        is_active=False,
+    )
+    session.add(owner)
+    session.commit()
+    batch = 10_000
+    for start in range(0, rows, batch):
+        values = [
+            {
+                "id": uuid.uuid4(),
+                "owner_id": owner.id,
+                "name": f"plant {i}",
+                "quantity": 1,
+                "date": date.today(),
+            }
+            for i in range(start, min(start + batch, rows))
+        ]
+        session.execute(insert(Plant), values)
+    adjust_counts(session.connection(), "plant", {owner.id: rows})
+    session.commit()
+    session.connection().exec_driver_sql("ANALYZE plant")
+    session.commit()
+    return owner.id
+
+
+def measure(
+    session: Session, owner_id: uuid.UUID, repeat: int, **page: int | str | None
+) -> tuple[float, float, int]:
+    timings = []
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            crud.get_page(session=session, model=Plant, owner_id=owner_id, **page)  # type: ignore[arg-type]
+            timings.append(time.perf_counter() - start)
+            session.rollback()
+    finally:
+        current_query_stats.reset(token)
+    quantiles = statistics.quantiles(timings, n=100)
+    return quantiles[49] * 1000, quantiles[94] * 1000, stats.count // repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        print(f"Seeding an owner with {args.rows} plants")
+        owner_id = seed(session, args.rows)
+        try:
+            _, _, cursor = crud.get_page(
+                session=session,
+                model=Plant,
+                owner_id=owner_id,
+                skip=args.rows // 2,
+                limit=args.limit,
+                include_count=False,
+            )
+            pages = {
+                "first page": {"limit": args.limit},
+                "deep offset": {"skip": args.rows // 2, "limit": args.limit},
+                "cursor": {"cursor": cursor, "limit": args.limit},
+            }
+            for name, params in pages.items():
+                for mode in MODES:
+                    settings.LIST_COUNT_MODE = mode
+                    p50, p95, queries = measure(
+                        session, owner_id, args.repeat, **params
+                    )
+                    print(
+                        f"{name:12} {mode:8} p50 {p50:8.2f} ms  p95 {p95:8.2f} ms  "
+                        f"{queries} queries"
+                    )
+        finally:
+            session.rollback()
+            session.execute(delete(Plant).where(Plant.owner_id == owner_id))
+            session.execute(delete(User).where(User.id == owner_id))
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()